@@ -1,13 +1,86 @@
 #!/usr/bin/env python3
+import os
+from itertools import islice
 import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import shared_memory
 import autodiff.trig as tr
-from autodiff.dual import Dual
-from autodiff.reverse import Node 
+import autodiff.codegen as cg
+import autodiff.sparse as sp
+import autodiff.ufunc # NumPy protocols and object array methods of Dual and Node
+from autodiff.dual import Dual, DualArray
+from autodiff.hyperdual import HyperDual
+from autodiff.taylor import Taylor
+from autodiff.reverse import Node, Tape, _outputs
+from autodiff.tape import CompiledTape
+from autodiff.memo import Memo
+
+
+def _columns(f, x, start, stop):
+    """
+    Columns start .. stop-1 of the Jacobian of f at x, from one evaluation of f with a tangent of length stop - start
+    (all columns for start = 0 and stop = len(x)). Defined at module level so that worker processes can unpickle it.
+    """
+    n, b = len(x), stop - start
+    seeds = np.zeros((n, b))
+    seeds[start:stop] = np.eye(b)
+    if n == 1:
+        z = Dual(x[0], seeds[0])
+    else:
+        z = [Dual(x[i], seeds[i]) for i in range(n)]
+
+    fz = f(z)
+    if isinstance(fz, (Dual, *Dual._supported_scalars)):
+        return ForwardDiff._tangent(fz, b)
+    return np.array([ForwardDiff._tangent(fz_i, b) for fz_i in fz])
+
+
+def _pool(workers):
+    """
+    Return (executor, whether it is owned by the caller and must be shut down, number of workers) for workers
+    given as a number of processes or as an existing Executor
+    """
+    if isinstance(workers, Executor):
+        return workers, False, getattr(workers, '_max_workers', None) or os.cpu_count()
+    return ProcessPoolExecutor(max_workers = workers), True, workers
+
+
+def _jacobian_rows(f, inputs, outputs, N, n, shape, start, stop):
+    """
+    Jacobians of f at the points start .. stop-1, read from and written to the shared memory blocks named inputs
+    (N x n points) and outputs (N Jacobians of the given shape). Defined at module level for worker processes.
+    """
+    input_block = shared_memory.SharedMemory(name = inputs)
+    output_block = shared_memory.SharedMemory(name = outputs)
+    try:
+        points = np.ndarray((N, n), dtype = float, buffer = input_block.buf)
+        jacobians = np.ndarray((N, *shape), dtype = float, buffer = output_block.buf)
+        obj = ReverseDiff(f)
+        for k in range(start, stop):
+            jacobians[k] = obj.Jacobian(points[k])
+        del points, jacobians # release the buffers before closing
+    finally:
+        input_block.close()
+        output_block.close()
+
+
+def _chunks(points, chunk_size):
+    """
+    Pull the points of an iterable in arrays of at most chunk_size points, without materializing the iterable
+    """
+    iterator = iter(points)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield np.array(chunk, dtype = float)
 
 
 class ForwardDiff: 
-    def __init__(self, f):
+    def __init__(self, f, memo = None):
         self.f = f 
+        self.memo = memo # optional autodiff.memo.Memo storing the results of Jacobian by input point
+        self._colorings = {} # number of inputs: (sparsity pattern, column colors) used by sparse_Jacobian
 
     def derivative(self, x, p=[1]):
         """ 
@@ -41,59 +114,566 @@ class ForwardDiff:
         else:
             raise TypeError(f'Unsupported type for derivative function. X is of type {type(x)}')
 
-        if type(self.f(z)) is Dual:
-            return self.f(z).dual 
+        fz = self.f(z)
+        if type(fz) is Dual:
+            return fz.dual 
         else:
             output=[]
-            for i in self.f(z):
+            for i in fz:
                 output.append(i.dual)
             return output
         
 
-    def Jacobian(self, x):
-        # construct a dual number 
-        deri_array = []
-        for i in range(len(x)):
-            p = np.zeros(len(x))
-            p[i] = 1
-            deri_array.append(self.derivative(x, p))
-        return np.array(deri_array).T
+    def derivative_batch(self, xs, p=[1]):
+        """ 
+        Parameters
+        ==========
+        xs : array of N sample points, of shape (N,) for a function of one variable or (N, n) for a function of n variables
+        p : direction at which the direcitonal derivative is evaluated 
+
+        Returns
+        =======
+        the derivatives at all sample points: an array of shape (N,), or (m, N) for a function with m components
+
+        Example: 
+        =======
+        z_i = DualArray(xs[:, i], p_i)
+        f(z).real = f evaluated at every sample point
+        f(z).dual = D_p_{f} evaluated at every sample point
+        """
+        xs = np.asarray(xs, dtype=float)
+        if xs.ndim == 1:
+            xs = xs[:, np.newaxis]
+        elif xs.ndim != 2:
+            raise TypeError(f'Unsupported shape for derivative_batch function. xs has shape {xs.shape}')
+        if len(p) != xs.shape[1]:
+            raise Exception('length of p should be the same as the number of variables in xs')
+
+        if xs.shape[1] == 1:
+            z = DualArray(xs[:, 0], p[0])
+        else:
+            z = [DualArray(xs[:, i], p[i]) for i in range(xs.shape[1])]
+
+        fz = self.f(z)
+        if isinstance(fz, (Dual, *DualArray._supported_scalars)):
+            return self._batch_tangent(fz, len(xs))
+        return np.array([self._batch_tangent(fz_i, len(xs)) for fz_i in fz])
+
+    @staticmethod
+    def _batch_tangent(y, N):
+        """
+        Return the derivatives of an output of f at N sample points, zeros if the output does not depend on the input
+        """
+        if isinstance(y, Dual):
+            return np.array(np.broadcast_to(y.dual, (N,)))
+        return np.zeros(N)
+
+    def Jacobian(self, x, workers = None, chunk_size = None):
+        """
+        Parameters
+        ==========
+        x : point at which the Jacobian is evaluated
+        workers : None (default) to evaluate in this process, otherwise the number of worker processes of a
+                  concurrent.futures.ProcessPoolExecutor, or an Executor to reuse (its pool start-up is then paid once)
+        chunk_size : number of Jacobian columns per task (default: the columns split evenly over the workers)
+
+        Returns
+        =======
+        the Jacobian of f at x, from a single evaluation of f, or one evaluation per block of chunk_size columns
+        spread over the workers. With workers, f must be picklable (a function defined at module level, not a lambda).
+        With a memo, a point seen before is answered from it without evaluating f.
+
+        Example: 
+        =======
+        z_i = Dual(x_i, e_i), with e_i the i-th row of the identity
+        f(z).dual = gradient of f (one row of the Jacobian per component of f)
+        ForwardDiff(f).Jacobian(x, workers = 8)   # columns of blocks of n/8 inputs in 8 processes
+        """
+        if self.memo is not None:
+            return self.memo.get(Memo.key('Jacobian', x), lambda: self._Jacobian(x, workers, chunk_size))
+        return self._Jacobian(x, workers, chunk_size)
+
+    def _Jacobian(self, x, workers, chunk_size):
+        if workers is not None:
+            return self._parallel_Jacobian(x, workers, chunk_size)
+        return _columns(self.f, x, 0, len(x))
+
+    def _parallel_Jacobian(self, x, workers, chunk_size):
+        """
+        Evaluate the column blocks of the Jacobian in worker processes and assemble them in a preallocated array
+        """
+        n = len(x)
+        x = [float(x_i) for x_i in x]
+        executor, owned, count = _pool(workers)
+        if chunk_size is None:
+            chunk_size = -(-n // count)
+        starts = range(0, n, chunk_size)
+        try:
+            futures = [executor.submit(_columns, self.f, x, start, min(start + chunk_size, n)) for start in starts]
+            J = None
+            for start, future in zip(starts, futures):
+                block = future.result()
+                if J is None:
+                    J = np.zeros(block.shape[:-1] + (n,))
+                J[..., start:start + block.shape[-1]] = block
+        finally:
+            if owned:
+                executor.shutdown()
+        return J
+
+    def iter_jacobians(self, points, chunk_size = 256):
+        """ 
+        Parameters
+        ==========
+        points : iterable of input points of length n (a list, a generator, a file reader, ...), consumed lazily
+        chunk_size : number of points pulled from points and evaluated together
+
+        Returns
+        =======
+        a generator of the Jacobians at the points, in order: arrays of shape (n,) for a scalar f and (m, n)
+        otherwise. Each chunk is evaluated with n vectorized passes of f on DualArray objects (as derivative_batch),
+        so f must accept NumPy arrays, and memory is bounded by the chunk size, whatever the length of the stream.
+
+        Example: 
+        =======
+        for J in ForwardDiff(f).iter_jacobians(read_points(path), chunk_size = 1000):
+            ...
+        """
+        for chunk in _chunks(points, chunk_size):
+            n = chunk.shape[1]
+            seeds = np.eye(n)
+            columns = [self.derivative_batch(chunk, seeds[i]) for i in range(n)] # each (N,) or (m, N)
+            jacobians = np.stack(columns, axis = -1)
+            if jacobians.ndim == 3:
+                jacobians = jacobians.transpose(1, 0, 2) # (N, m, n)
+            yield from jacobians
+
+    def sparse_Jacobian(self, x):
+        """ 
+        Parameters
+        ==========
+        x : point at which the Jacobian is evaluated
+
+        Returns
+        =======
+        the Jacobian of f at x as a scipy.sparse.csr_matrix
+
+        The sparsity pattern is traced through a Node graph on the first call for a given number of inputs, and
+        structurally orthogonal columns are colored alike. Every later call is a single evaluation of f with one
+        tangent direction per color, so the cost depends on the number of colors instead of the number of inputs.
+        If f branches on its inputs, the pattern is the one of the branch taken at the first point.
+
+        Example: 
+        =======
+        z_j = Dual(x_j, e_color(j))
+        f_i(z).dual[color(j)] = J[i, j] for every nonzero J[i, j]
+        """
+        n = len(x)
+        if n not in self._colorings:
+            pattern = sp.sparsity_pattern(self.f, x)
+            self._colorings[n] = (pattern, sp.color_columns(pattern, n))
+        pattern, colors = self._colorings[n]
+        compressed = sp.compressed_Jacobian(self.f, x, colors)
+        return sp.decompress(compressed, pattern, colors, n)
+
+    def Hessian(self, x):
+        """ 
+        Parameters
+        ==========
+        x : point at which the Hessian is evaluated
+
+        Returns
+        =======
+        the Hessian of f at x, an (n, n) array, or an (m, n, n) array for a function with m components
+
+        Example: 
+        =======
+        z_k = HyperDual(x_k, delta_ki, delta_kj, 0)
+        f(z).eps12 = d^2 f / dx_i dx_j
+        only the upper triangle i <= j is evaluated, the lower triangle is filled by symmetry
+        """
+        n = len(x)
+        H = None
+        for i in range(n):
+            for j in range(i, n):
+                z = [HyperDual(x[k], float(k == i), float(k == j), 0.0) for k in range(n)]
+                outputs, scalar = _outputs(self.f(z[0] if n == 1 else z))
+                second = np.array([fz_k.eps12 if type(fz_k) is HyperDual else 0.0 for fz_k in outputs])
+                if scalar:
+                    second = second[0]
+                if H is None:
+                    H = np.zeros(np.shape(second) + (n, n))
+                H[..., i, j] = H[..., j, i] = second
+        return H
+
+    def taylor(self, x, order, p=[1]):
+        """ 
+        Parameters
+        ==========
+        x : point at which the derivatives are evaluated, a scalar or a vector
+        order : highest derivative order
+        p : direction along which a function of a vector is differentiated
+
+        Returns
+        =======
+        the array [f(x), f'(x), ..., f^(order)(x)] of derivatives along p,
+        or an array of shape (m, order + 1) for a function with m components
+
+        Example: 
+        =======
+        z_i = Taylor([x_i, p_i, 0, ..., 0])
+        f(z).coeffs[k] * k! = d^k/dt^k f(x + t p) at t = 0
+        """
+        scalars = [float, int, np.float64]
+        if type(x) in scalars:
+            z = Taylor.variable(x, order)
+        elif isinstance(x, list) or isinstance(x, np.ndarray):
+            if len(p)!=len(x):
+                raise Exception('length of p should be the same as length of x')
+            if len(x)==1:
+                z = Taylor.variable(x[0], order, p[0])
+            else:
+                z = [Taylor.variable(x[i], order, p[i]) for i in range(len(x))]
+        else:
+            raise TypeError(f'Unsupported type for taylor function. X is of type {type(x)}')
+
+        def derivatives(y):
+            if type(y) is Taylor:
+                return y.derivatives()
+            return np.r_[y, np.zeros(order)] # constant component
+
+        outputs, scalar = _outputs(self.f(z))
+        if scalar:
+            return derivatives(outputs[0])
+        return np.array([derivatives(fz_i) for fz_i in outputs])
+
+    def jvp(self, x, v):
+        """ 
+        Parameters
+        ==========
+        x : point at which the Jacobian-vector product is evaluated
+        v : vector multiplied by the Jacobian
+
+        Returns
+        =======
+        J(x) @ v from a single evaluation of f, without forming J: a scalar for a scalar f, otherwise an array of length m
+
+        Example: 
+        =======
+        z_i = Dual(x_i, v_i)
+        f(z).dual = J(x) @ v
+        """
+        if len(v) != len(x):
+            raise Exception('length of v should be the same as length of x')
+        if len(x) == 1:
+            z = Dual(x[0], v[0])
+        else:
+            z = [Dual(x[i], v[i]) for i in range(len(x))]
+
+        fz = self.f(z)
+        if isinstance(fz, (Dual, *Dual._supported_scalars)):
+            return fz.dual if type(fz) is Dual else 0.0
+        return np.array([fz_i.dual if type(fz_i) is Dual else 0.0 for fz_i in fz])
+
+    @staticmethod
+    def _tangent(y, n):
+        """
+        Return the vector of tangents of an output of f, zeros if the output does not depend on the input
+        """
+        if type(y) is Dual:
+            return y.dual
+        return np.zeros(n)
 
 
  
 class ReverseDiff:
 
-    def __init__(self, f):
+    def __init__(self, f, memo = None):
         self.f = f
+        self.memo = memo # optional autodiff.memo.Memo storing the results of Jacobian by input point
         
 
 
+    def _trace(self, vector):
+        """
+        Evaluate f on leaf nodes holding the components of vector, recording the graph on a tape.
+        Other leaves f uses (e.g. a Node parameter created outside of f) are constants of the trace.
+        """
+        with Tape() as tape:
+            iv_nodes = [Node(1-k) for k in range(len(vector))] #nodes of independent variables, key value numbering according to vs
+            for i, iv_node in enumerate(iv_nodes):
+                iv_node.value = vector[i]
+
+            outer, Node._trace = Node._trace, ({id(iv_node) for iv_node in iv_nodes}, [])
+            try:
+                tree = self.f([*iv_nodes]) 
+            finally:
+                for leaf in Node._trace[1]:
+                    leaf.active = True
+                Node._trace = outer
+        return tape, iv_nodes, tree
+
     def Jacobian(self, vector):
         
-        iv_nodes = [Node(1-k) for k in range(len(vector))] #nodes of independent variables, key value numbering according to vs
-        for i, iv_node in enumerate(iv_nodes):
-            iv_node.value = vector[i]
+        if self.memo is not None:
+            return self.memo.get(Memo.key('Jacobian', vector), lambda: self._sweep(*self._trace(vector)))
+        return self._sweep(*self._trace(vector))
 
-        
-        tree = self.f([*iv_nodes]) 
-        print(type(tree))
-        if type(tree) is Node:
-            #tree._eval()
-            #print(tree)
-            tree.sensitivity = 1
-            tree._sens()
+    @staticmethod
+    def _sweep(tape, iv_nodes, tree):
+        """
+        Return the Jacobian of a traced graph, in the format of Jacobian
+        """
+        outputs, scalar = _outputs(tree)
+        if scalar:
+            if not isinstance(outputs[0], Node): # f does not depend on its inputs
+                return [0.0] * len(iv_nodes)
+            tape.backward(outputs[0])
             return [iv_node.sensitivity for iv_node in iv_nodes]
 
         else:
-            deri_array = []
-            for line in tree:
-                #line._eval()
-                line._reset()
-                line.sensitivity=1
-                line._sens()
-                
-                line_partials = [iv_node.sensitivity for iv_node in iv_nodes]
-                deri_array.append(line_partials )
-            return deri_array
+            # single sweep: output i is seeded with the i-th row of the identity, so every node carries
+            # a vector of adjoints (one per output) and the leaves end up holding the columns of the Jacobian
+            tape.backward_many(outputs, np.eye(len(outputs)))
+            deri_array = np.zeros((len(outputs), len(iv_nodes)))
+            for k, iv_node in enumerate(iv_nodes):
+                deri_array[:, k] += iv_node.sensitivity # stays 0 if no output depends on the input
+            return deri_array.tolist()
 
+    def Jacobian_many(self, points, workers = None, chunk_size = None):
+        """ 
+        Parameters
+        ==========
+        points : N input points, an array of shape (N, n)
+        workers : None (default) to evaluate in this process, otherwise the number of worker processes of a
+                  concurrent.futures.ProcessPoolExecutor, or an Executor to reuse (its pool start-up is then paid once)
+        chunk_size : number of points per task (default: the points split evenly over the workers)
+
+        Returns
+        =======
+        the Jacobians at all points, in the order of points: an array of shape (N, n) for a scalar f and (N, m, n)
+        otherwise. With workers, the points and the Jacobians are passed through shared memory, so a task only
+        pickles f and the range of its points; f must be picklable (a function defined at module level).
 
+        Example: 
+        =======
+        J = ReverseDiff(f).Jacobian_many(X, workers = 8)
+        J[k] == ReverseDiff(f).Jacobian(X[k])
+        """
+        points = np.ascontiguousarray(points, dtype = float)
+        if points.ndim != 2:
+            raise TypeError(f'Unsupported shape for Jacobian_many function. points has shape {points.shape}')
+        N, n = points.shape
+        if N == 0:
+            return np.zeros((0, n))
+        first = np.array(self.Jacobian(points[0]), dtype = float) # shape of the output
+        if workers is None or N == 1:
+            jacobians = np.empty((N, *first.shape))
+            jacobians[0] = first
+            for k in range(1, N):
+                jacobians[k] = self.Jacobian(points[k])
+            return jacobians
+
+        executor, owned, count = _pool(workers)
+        if chunk_size is None:
+            chunk_size = -(-(N - 1) // count)
+        input_block = shared_memory.SharedMemory(create = True, size = points.nbytes)
+        output_block = shared_memory.SharedMemory(create = True, size = max(1, N*first.nbytes))
+        try:
+            np.ndarray(points.shape, dtype = float, buffer = input_block.buf)[:] = points
+            futures = [executor.submit(_jacobian_rows, self.f, input_block.name, output_block.name, N, n, first.shape,
+                                       start, min(start + chunk_size, N)) for start in range(1, N, chunk_size)]
+            for future in futures:
+                future.result()
+            jacobians = np.ndarray((N, *first.shape), dtype = float, buffer = output_block.buf).copy()
+            jacobians[0] = first
+        finally:
+            if owned:
+                executor.shutdown()
+            input_block.close()
+            input_block.unlink()
+            output_block.close()
+            output_block.unlink()
+        return jacobians
+
+    def iter_jacobians(self, points, chunk_size = 256, workers = None):
+        """ 
+        Parameters
+        ==========
+        points : iterable of input points of length n (a list, a generator, a file reader, ...), consumed lazily
+        chunk_size : number of points pulled from points and evaluated together
+        workers : as for Jacobian_many, the points of a chunk are then spread over worker processes of one pool,
+                  started on the first chunk and shut down when the generator ends or is closed
+
+        Returns
+        =======
+        a generator of the Jacobians at the points, in order, in the format of Jacobian_many (one chunk at a time),
+        so memory is bounded by the chunk size, whatever the length of the stream
+
+        Example: 
+        =======
+        for J in ReverseDiff(f).iter_jacobians(read_points(path), chunk_size = 1000):
+            ...
+        """
+        if workers is None:
+            for chunk in _chunks(points, chunk_size):
+                yield from self.Jacobian_many(chunk)
+            return
+        executor, owned, count = _pool(workers) # one pool for the whole stream
+        try:
+            for chunk in _chunks(points, chunk_size):
+                yield from self.Jacobian_many(chunk, workers = executor)
+        finally:
+            if owned:
+                executor.shutdown()
+
+    def vjp(self, vector, u):
+        """ 
+        Parameters
+        ==========
+        vector : point at which the vector-Jacobian product is evaluated
+        u : cotangent vector, one component per output of f (a scalar for a scalar f)
+
+        Returns
+        =======
+        u^T @ J(vector) as an array of length n, from one evaluation of f and a single reverse sweep, without forming J
+
+        Example: 
+        =======
+        output_i.sensitivity = u_i
+        iv_node_j.sensitivity = sum_i u_i * d output_i / d x_j after the sweep
+        """
+        tape, iv_nodes, tree = self._trace(vector)
+        outputs, scalar = _outputs(tree)
+        if not scalar:
+            if len(u) != len(outputs):
+                raise Exception('length of u should be the same as the number of outputs of f')
+            tape.backward_many(outputs, u)
+        else:
+            tape.backward_many(outputs, [u[0] if np.ndim(u) else u])
+        return np.array([iv_node.sensitivity for iv_node in iv_nodes], dtype=float)
+
+    def compile(self, vector):
+        """ 
+        Parameters
+        ==========
+        vector : point at which f is traced
+
+        Returns
+        =======
+        a CompiledTape which replays the forward and reverse sweeps of f at new points without calling f again
+
+        Example: 
+        =======
+        tape = ReverseDiff(f).compile(x0)
+        tape.Jacobian(x1) == ReverseDiff(f).Jacobian(x1)   # as long as f takes the same branches at x1
+        """
+        tape, iv_nodes, tree = self._trace(vector)
+        return CompiledTape(tape, iv_nodes, tree)
+
+    def generate(self, vector):
+        """ 
+        Parameters
+        ==========
+        vector : point at which f is traced
+
+        Returns
+        =======
+        a generated straight-line function g with g(x) = (f(x), Jacobian of f at x), cached per function and number of inputs
+
+        The generated code calls the functions of the math module on floats, which is about twice as fast as NumPy
+        for scalars. Outside of their domain they raise instead of returning nan with a RuntimeWarning as Jacobian
+        does: e.g. g raises ValueError for sqrt or log of a negative number, and ZeroDivisionError for 1/x at 0.
+
+        Example: 
+        =======
+        g = ReverseDiff(f).generate(x0)
+        value, J = g(x1)
+        print(g.source)   # generated code
+        """
+        function = cg.cached(self.f, len(vector))
+        if function is None:
+            tape, iv_nodes, tree = self._trace(vector)
+            function = cg.compile_graph(tape, iv_nodes, tree, name = getattr(self.f, '__name__', 'f').replace('<lambda>', 'f') + '_gradient')
+            cg.store(self.f, len(vector), function)
+        return function
+
+
+class AutoDiff:
+    """
+    Jacobian with automatic choice between forward and reverse mode.
+
+    On the first call for a given number of inputs, f is traced once through a Node graph to measure the number
+    of inputs n, of outputs m and of graph nodes G. Forward mode costs about G*(FORWARD_NODE + FORWARD_TANGENT*n),
+    reverse mode about G*REVERSE_NODE for a scalar f and G*(REVERSE_VECTOR_NODE + REVERSE_ADJOINT*m) otherwise
+    (microseconds, fitted to Jacobian timings of both modes by benchmarks/fit_costs.py). The cheaper mode is remembered per number of inputs
+    and the record of the decision is kept in decisions.
+
+    f always receives a list, as with ReverseDiff, also when len(x) == 1.
+
+    Example:
+    =======
+    J = AutoDiff(f).Jacobian(x)
+    AutoDiff(f).decisions[len(x)]['mode'] in ('forward', 'reverse')
+    """
+
+    FORWARD_NODE = 2.0
+    FORWARD_TANGENT = 0.0019
+    REVERSE_NODE = 1.6
+    REVERSE_VECTOR_NODE = 5.0
+    REVERSE_ADJOINT = 0.012
+
+    def __init__(self, f):
+        self.f = f
+        self.decisions = {} # number of inputs: record of the mode decision
+        self._forward = ForwardDiff(lambda z: f(z if isinstance(z, list) else [z]))
+        self._reverse = ReverseDiff(f)
+
+    def mode(self, x):
+        """
+        Return the mode ('forward' or 'reverse') used for points of the length of x, tracing f at x if needed
+        """
+        n = len(x)
+        if n not in self.decisions:
+            self._decide(*self._reverse._trace(x))
+        return self.decisions[n]['mode']
+
+    def Jacobian(self, x):
+        """ 
+        Parameters
+        ==========
+        x : point at which the Jacobian is evaluated
+
+        Returns
+        =======
+        the Jacobian of f at x, an array of shape (n,) for a scalar f and (m, n) otherwise,
+        computed in the mode chosen for len(x)
+        """
+        n = len(x)
+        if n not in self.decisions:
+            traced = self._reverse._trace(x)
+            if self._decide(*traced)['mode'] == 'reverse':
+                return np.array(ReverseDiff._sweep(*traced), dtype=float) # reuse the probe
+        if self.decisions[n]['mode'] == 'forward':
+            return self._forward.Jacobian(x)
+        return np.array(self._reverse.Jacobian(x), dtype=float)
+
+    def _decide(self, tape, iv_nodes, tree):
+        """
+        Evaluate the cost model on a traced graph and record the decision
+        """
+        n, G = len(iv_nodes), len(tape)
+        m = len(_outputs(tree)[0])
+        forward = G*(self.FORWARD_NODE + self.FORWARD_TANGENT*n)
+        if m == 1:
+            reverse = G*self.REVERSE_NODE
+        else:
+            reverse = G*(self.REVERSE_VECTOR_NODE + self.REVERSE_ADJOINT*m)
+        mode = 'forward' if forward <= reverse else 'reverse'
+        decision = self.decisions[n] = {
+            'mode': mode, 'inputs': n, 'outputs': m, 'nodes': G,
+            'forward_cost': forward, 'reverse_cost': reverse,
+            'reason': f'{mode} mode: estimated {min(forward, reverse):.0f} us against {max(forward, reverse):.0f} us '
+                      f'for {n} inputs, {m} outputs and {G} graph nodes',
+        }
+        return decision
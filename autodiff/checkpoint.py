@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""Checkpointing (rematerialization) for long chains of steps in reverse mode.
+
+A simulation x_{k+1} = step(x_k), k = 0 .. steps-1, differentiated as one Node graph keeps every intermediate value
+and partial of every step until the reverse pass ends. Checkpoint runs the forward pass on plain numbers, stores the
+states of selected steps only, and during the reverse pass recomputes the states of each segment from its stored
+state, tracing a Node graph of one step at a time. Memory then grows with the number of stored states instead of
+the number of steps, at the price of evaluating some steps more than once.
+"""
+
+from math import comb, isqrt
+import numpy as np
+from autodiff.autoDiff import ReverseDiff
+from autodiff.reverse import _outputs
+
+
+class Checkpoint:
+    """
+    Jacobian of output(step^steps(x)) wrt x, with the states of the chain stored according to a schedule:
+
+    every = k: store the state of every k-th step during the forward pass, then reverse the segments from the last
+               one, recomputing and holding the k states of one segment at a time. About steps/k + k stored states
+               and one extra evaluation of every step (the default, k = sqrt(steps), minimizes the stored states).
+    snapshots = s: binomial (Revolve) schedule, at most s stored states besides the input. The number of
+               evaluations of each step grows with the smallest t such that C(s + t, s) >= steps, i.e. logarithmically
+               in steps for a fixed s.
+
+    step takes and returns a list of the same length (as f of ReverseDiff, also for a single state variable) and
+    is called on floats for the forward pass and recomputations, on Node objects for the reverse pass of one step.
+    output maps the final state to a scalar or a list (default: the final state itself).
+
+    After a call, evaluations is the number of step evaluations on floats, traced the number of steps traced as a
+    Node graph (always steps), and peak_states the largest number of states stored at the same time (checkpoints and
+    recomputed states of a segment, the input included).
+
+    Example:
+    =======
+    chain = Checkpoint(lambda x: [x[0] + 0.01*sin(x[1]), x[1] - 0.01*x[0]], 10**5, snapshots = 20)
+    chain.Jacobian([0.5, 1.0])   # 2x2 Jacobian of the state after 10**5 steps
+    """
+
+    def __init__(self, step, steps, output = None, *, every = None, snapshots = None):
+        if every is not None and snapshots is not None:
+            raise Exception('choose either every or snapshots as the checkpointing schedule')
+        if steps < 1:
+            raise Exception('steps should be a positive integer')
+        if every is None and snapshots is None:
+            every = max(1, isqrt(steps))
+        if (every is not None and every < 1) or (snapshots is not None and snapshots < 0):
+            raise Exception('every should be positive and snapshots non-negative')
+        self.step = step
+        self.steps = steps
+        self.output = output
+        self.every = every
+        self.snapshots = snapshots
+        self.evaluations = 0
+        self.traced = 0
+        self.peak_states = 0
+        self._held = 0
+        self._u = None
+        self._scalar = False
+
+    def Jacobian(self, vector):
+        """
+        Parameters
+        ==========
+        vector : initial state x_0
+
+        Returns
+        =======
+        the Jacobian of output(x_steps) wrt x_0, in the format of ReverseDiff.Jacobian (a list for a scalar output,
+        a list of rows otherwise)
+        """
+        adjoint, scalar = self._run(vector, None)
+        if scalar:
+            return adjoint[:, 0].tolist()
+        return adjoint.T.tolist()
+
+    def vjp(self, vector, u):
+        """
+        Parameters
+        ==========
+        vector : initial state x_0
+        u : cotangent vector, one component per output (a scalar for a scalar output)
+
+        Returns
+        =======
+        u^T @ J(vector) as an array of length n, with a single adjoint carried through the chain
+        """
+        return self._run(vector, u)[0][:, 0]
+
+    def _run(self, vector, u):
+        self.evaluations = self.traced = self.peak_states = self._held = 0
+        self._u = u
+        start = self._hold([float(v) for v in vector])
+        if self.every is not None:
+            adjoint = self._reverse_every(self._forward_every(start))
+        else:
+            adjoint = self._reverse_binomial(0, self.steps, start, None, self.snapshots)
+            self._release()
+        return adjoint, self._scalar
+
+    def _hold(self, state):
+        self._held += 1
+        self.peak_states = max(self.peak_states, self._held)
+        return state
+
+    def _release(self):
+        self._held -= 1
+
+    def _advance(self, state, count):
+        """
+        State count steps after state, on plain numbers, holding one state at a time
+        """
+        for _ in range(count):
+            self.evaluations += 1
+            state = list(self.step(state))
+        return state
+
+    def _step_vjp(self, state, adjoint):
+        """
+        Adjoint of the input of one step at state from the adjoint of its output, by tracing the step on Node objects.
+        The last step of the chain (adjoint None) is traced together with output and seeded at its outputs:
+        one column per output, or the cotangent u of vjp.
+        """
+        self.traced += 1
+        if adjoint is None:
+            f = self.step if self.output is None else lambda x: self.output(self.step(x))
+            tape, iv_nodes, tree = ReverseDiff(f)._trace(state)
+            outputs, self._scalar = _outputs(tree)
+            if self._u is None:
+                seeds = np.eye(len(outputs))
+            else:
+                seeds = np.reshape(np.asarray(self._u, dtype = float), (-1, 1))
+        else:
+            tape, iv_nodes, tree = ReverseDiff(self.step)._trace(state)
+            outputs = _outputs(tree)[0]
+            seeds = adjoint
+        tape.backward_many(outputs, seeds)
+        return self._adjoint(iv_nodes, len(seeds[0]))
+
+    @staticmethod
+    def _adjoint(iv_nodes, m):
+        adjoint = np.zeros((len(iv_nodes), m))
+        for k, iv_node in enumerate(iv_nodes):
+            adjoint[k] += iv_node.sensitivity # stays 0 if no output depends on the input
+        return adjoint
+
+    def _forward_every(self, state):
+        """
+        Forward pass storing the states of the steps 0, k, 2k, ... before the end of the chain
+        """
+        stored = [state]
+        for _ in range(self.every, self.steps, self.every):
+            state = self._hold(self._advance(state, self.every))
+            stored.append(state)
+        return stored
+
+    def _reverse_every(self, stored):
+        adjoint = None
+        for index in range(len(stored) - 1, -1, -1):
+            start = index*self.every
+            segment = [stored[index]]
+            for _ in range(min(self.every, self.steps - start) - 1):
+                segment.append(self._hold(self._advance(segment[-1], 1)))
+            for state in reversed(segment):
+                adjoint = self._step_vjp(state, adjoint)
+                self._release()
+            stored.pop()
+        return adjoint
+
+    def _reverse_binomial(self, a, b, state, adjoint, snapshots):
+        """
+        Reverse the steps a .. b-1 from the state x_a, given the adjoint of x_b (None at the end of the chain), with at
+        most snapshots more stored states, as in Griewank's binomial checkpointing: the steps m .. b-1 are reversed
+        first with one snapshot less (x_m stored), then a .. m-1 with the snapshot freed. The second part loops
+        instead of recursing, so the recursion depth is bounded by snapshots, not by the number of steps.
+        """
+        while b - a > 1 and snapshots > 0:
+            n = b - a
+            repetitions = 0
+            while comb(snapshots + repetitions, snapshots) < n:
+                repetitions += 1
+            m = b - min(comb(snapshots - 1 + repetitions, snapshots - 1), n - 1)
+            middle = self._hold(self._advance(state, m - a))
+            adjoint = self._reverse_binomial(m, b, middle, adjoint, snapshots - 1)
+            self._release()
+            b = m
+        for k in range(b - 1, a - 1, -1): # a single step, or no snapshot left: advance from x_a for every step
+            adjoint = self._step_vjp(self._advance(state, k - a), adjoint)
+        return adjoint
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""Source code generation for reverse mode AD.
+
+A traced Node graph is turned into the source of a straight-line Python function which computes the value of
+the function and its full gradient/Jacobian: one assignment per node for the forward sweep, one per edge for the
+reverse sweep, with no per-node method dispatch. The source is loaded with compile/exec.
+"""
+
+import math
+import weakref
+import autodiff.trig as tr
+from autodiff.dual import Dual
+from autodiff.reverse import Node, _outputs
+
+
+# key: (value, left partial, right partial) templates, {a} is the left child and {b} the right child or the constant
+_TEMPLATES = {
+    'add': ('{a} + {b}', '1', '1'),
+    'sub': ('{a} - {b}', '1', '-1'),
+    'rsub': ('{b} - {a}', '-1', None),
+    'mul': ('{a} * {b}', '{b}', '{a}'),
+    'div': ('{a} / {b}', '1 / {b}', '-{a} / ({b} * {b})'),
+    'pow': ('{a} ** {b}', '{b} * {a} ** ({b} - 1)', 'log({a}) * {a} ** {b}'),
+    'rdiv': ('{b} / {a}', '-{b} / ({a} * {a})', None),
+    'rpow': ('{b} ** {a}', 'log({b}) * {b} ** {a}', None),
+    'neg': ('-{a}', '-1', None),
+    'sin': ('sin({a})', 'cos({a})', None),
+    'cos': ('cos({a})', '-sin({a})', None),
+    'tan': ('tan({a})', '1 / cos({a}) ** 2', None),
+    'log': ('log({a})', '1 / {a}', None),
+    'log2': ('log2({a})', '1 / ({a} * log(2))', None),
+    'log10': ('log10({a})', '1 / ({a} * log(10))', None),
+    'sinh': ('sinh({a})', 'cosh({a})', None),
+    'cosh': ('cosh({a})', 'sinh({a})', None),
+    'tanh': ('tanh({a})', '1 / cosh({a}) ** 2', None),
+    'exp': ('exp({a})', 'exp({a})', None),
+    'sqrt': ('sqrt({a})', '0.5 / sqrt({a})', None),
+    'arcsin': ('asin({a})', '1 / sqrt(1 - {a} ** 2)', None),
+    'arccos': ('acos({a})', '-1 / sqrt(1 - {a} ** 2)', None),
+    'arctan': ('atan({a})', '1 / (1 + {a} ** 2)', None),
+    'logist': ('logist({a}, *{b})', 'dlogist({a}, *{b})', None),
+}
+
+_NAMESPACE = {name: getattr(math, name) for name in
+              ('sin', 'cos', 'tan', 'log', 'log2', 'log10', 'sinh', 'cosh', 'tanh', 'exp', 'sqrt', 'asin', 'acos', 'atan')}
+_NAMESPACE['logist'] = tr.logist
+_NAMESPACE['dlogist'] = lambda x, loc, scale: tr.logist(Dual(x), loc, scale).dual
+_NAMESPACE['Dual'] = Dual
+
+_cache = weakref.WeakKeyDictionary() # f: {number of inputs: generated function}
+
+
+def generate_source(tape, inputs, outputs, name = 'gradient'):
+    """
+    Parameters
+    ==========
+    tape : Tape recorded while evaluating f
+    inputs : Node objects of the independent variables
+    outputs : Node (or constant) returned by f, or a sequence of them
+    name : name of the generated function
+
+    Returns
+    =======
+    the source code of the function name(x) returning (value, Jacobian), in the same format as ReverseDiff.Jacobian,
+    and the list of objects it references as _k[i] (constants and operations without a code template)
+
+    Only nodes reachable from the outputs are emitted, and only the partials wrt children which depend on an input,
+    so dead nodes (and their domain errors, such as a discarded sqrt at 0) do not reach the generated code.
+    """
+    outputs, scalar = _outputs(outputs)
+    live = _reachable(outputs)
+    active = {id(node) for node in inputs} # nodes which depend on an input
+    for node in tape.nodes:
+        if node.left is not None and (id(node.left) in active or (node.right is not None and id(node.right) in active)):
+            active.add(id(node))
+
+    slots = {}
+    constants = []
+    lines = [f'def {name}(x):']
+
+    def ref(obj):
+        constants.append(obj)
+        return f'_k[{len(constants) - 1}]'
+
+    def var(node):
+        if id(node) not in slots: # leaf created outside the traced call, or constant
+            slots[id(node)] = f'v{len(slots)}'
+            lines.append(f'    {slots[id(node)]} = {ref(node.value)}')
+        return slots[id(node)]
+
+    for i, node in enumerate(inputs):
+        slots[id(node)] = f'v{len(slots)}'
+        lines.append(f'    {slots[id(node)]} = x[{i}]')
+
+    partials = {} # id(node): (left partial, right partial) expressions
+    for node in tape.nodes:
+        if id(node) not in live:
+            continue
+        if node.left is None:
+            var(node)
+            continue
+        a = var(node.left)
+        if node.right is not None:
+            b = var(node.right)
+        else:
+            b = ref(node.constant) if node.constant is not None else None
+        v = slots[id(node)] = f'v{len(slots)}'
+        if node.key in _TEMPLATES:
+            value, left_partial, right_partial = _TEMPLATES[node.key]
+            lines.append(f'    {v} = {value.format(a=a, b=b)}')
+            dl = _partial(lines, f'dl{v}', left_partial.format(a=a, b=b)) if id(node.left) in active else None
+            dr = _partial(lines, f'dr{v}', right_partial.format(a=a, b=b)) if id(node.right) in active else None
+        else: # operation without a code template: evaluate it on dual numbers, as Node._eval does
+            op = ref(node.operation)
+            if node.right is None:
+                lines.append(f'    _d = {op}(Dual({a}))')
+            else:
+                lines.append(f'    _d = {op}(Dual({a}, 1), Dual({b}, 0))')
+            lines.append(f'    {v}, dl{v} = _d.real, _d.dual')
+            dl = f'dl{v}' if id(node.left) in active else None
+            dr = None
+            if id(node.right) in active:
+                lines.append(f'    dr{v} = {op}(Dual({a}, 0), Dual({b}, 1)).dual')
+                dr = f'dr{v}'
+        partials[id(node)] = (dl, dr)
+
+    values, rows = [], []
+    for j, out in enumerate(outputs):
+        if not isinstance(out, Node):
+            values.append(ref(out))
+            rows.append('[' + ', '.join('0' for _ in inputs) + ']')
+            continue
+        values.append(var(out))
+        rows.append(_adjoint(lines, tape, slots, partials, inputs, out, f'g{j}_'))
+
+    if scalar:
+        lines.append(f'    return {values[0]}, {rows[0]}')
+    else:
+        lines.append(f'    return [{", ".join(values)}], [{", ".join(rows)}]')
+    return '\n'.join(lines) + '\n', constants
+
+
+def _reachable(outputs):
+    """
+    Return the ids of the nodes the outputs depend on, the outputs included
+    """
+    live = set()
+    stack = [out for out in outputs if isinstance(out, Node)]
+    while stack:
+        node = stack.pop()
+        if id(node) in live:
+            continue
+        live.add(id(node))
+        stack.extend(child for child in (node.left, node.right) if child is not None)
+    return live
+
+
+def _partial(lines, name, expression):
+    """
+    Emit the assignment of a partial derivative, constant partials are inlined
+    """
+    if expression in ('1', '-1'):
+        return expression
+    lines.append(f'    {name} = {expression}')
+    return name
+
+
+def _adjoint(lines, tape, slots, partials, inputs, output, prefix):
+    """
+    Emit the straight-line reverse sweep seeded at output and return the expression of the gradient
+    """
+    adjoints = {id(output): f'{prefix}{slots[id(output)]}'}
+    lines.append(f'    {adjoints[id(output)]} = 1')
+    for node in reversed(tape.nodes):
+        g = adjoints.get(id(node))
+        if g is None or node.left is None:
+            continue
+        dl, dr = partials[id(node)]
+        if dl is not None: # None: the child does not depend on an input
+            _accumulate(lines, adjoints, slots, prefix, node.left, g, dl)
+        if dr is not None:
+            _accumulate(lines, adjoints, slots, prefix, node.right, g, dr)
+    return '[' + ', '.join(adjoints.get(id(node), '0') for node in inputs) + ']'
+
+
+def _accumulate(lines, adjoints, slots, prefix, child, g, partial):
+    """
+    Emit child adjoint += g * partial
+    """
+    term = g if partial == '1' else f'-{g}' if partial == '-1' else f'{g} * {partial}'
+    if id(child) in adjoints:
+        lines.append(f'    {adjoints[id(child)]} += {term}')
+    else:
+        adjoints[id(child)] = f'{prefix}{slots[id(child)]}'
+        lines.append(f'    {adjoints[id(child)]} = {term}')
+
+
+def compile_graph(tape, inputs, outputs, name = 'gradient'):
+    """
+    Generate, compile and load the straight-line gradient function of a traced graph.
+    The source is kept in the source attribute of the returned function.
+    """
+    source, constants = generate_source(tape, inputs, outputs, name)
+    namespace = dict(_NAMESPACE, _k = constants)
+    exec(compile(source, f'<autodiff-codegen {name}>', 'exec'), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+def cached(f, n):
+    """
+    Return the generated function of f for n inputs, or None if it has not been generated yet
+    """
+    try:
+        return _cache.get(f, {}).get(n)
+    except TypeError: # f can not be weakly referenced
+        return None
+
+
+def store(f, n, function):
+    """
+    Cache the generated function of f for n inputs
+    """
+    try:
+        _cache.setdefault(f, {})[n] = function
+    except TypeError:
+        pass
@@ -7,25 +7,120 @@ This module contains dunder methods to overload built-in Python operators.
 
 import numpy as np
 
-class Dual:
+
+def _object_loop(ufunc, x):
+    from autodiff.ufunc import UNARY # autodiff.ufunc imports this module
+    return UNARY[ufunc](x)
+
+
+class _UfuncMethods:
+    """
+    Methods named after the unary ufuncs of autodiff.ufunc.UNARY, which NumPy's object loops call on every element
+    of an object array, e.g. np.exp(np.array([Dual(1.0), Dual(2.0)])). Shared by Dual and Node.
+    """
+    __slots__ = ()
+
+    def sin(self):
+        return _object_loop(np.sin, self)
+
+    def cos(self):
+        return _object_loop(np.cos, self)
+
+    def tan(self):
+        return _object_loop(np.tan, self)
+
+    def log(self):
+        return _object_loop(np.log, self)
+
+    def log2(self):
+        return _object_loop(np.log2, self)
+
+    def log10(self):
+        return _object_loop(np.log10, self)
+
+    def sinh(self):
+        return _object_loop(np.sinh, self)
+
+    def cosh(self):
+        return _object_loop(np.cosh, self)
+
+    def tanh(self):
+        return _object_loop(np.tanh, self)
+
+    def exp(self):
+        return _object_loop(np.exp, self)
+
+    def sqrt(self):
+        return _object_loop(np.sqrt, self)
+
+    def arcsin(self):
+        return _object_loop(np.arcsin, self)
+
+    def arccos(self):
+        return _object_loop(np.arccos, self)
+
+    def arctan(self):
+        return _object_loop(np.arctan, self)
+
+    def negative(self):
+        return _object_loop(np.negative, self)
+
+    def positive(self):
+        return _object_loop(np.positive, self)
+
+    def square(self):
+        return _object_loop(np.square, self)
+
+    def reciprocal(self):
+        return _object_loop(np.reciprocal, self)
+
+    def exp2(self):
+        return _object_loop(np.exp2, self)
+
+
+class Dual(_UfuncMethods):
+    """
+    Dual number real + dual*eps with eps**2 = 0.
+
+    The dual part is usually a scalar, but it can also be a NumPy vector holding several tangent directions at once.
+    Every operation then propagates all directions together, e.g. Dual(x_i, e_i) for the rows e_i of the identity
+    gives the full gradient of f in the dual part of f(z) after a single evaluation.
+    """
     
+    __slots__ = ('real', 'dual')
+
     _supported_scalars = (int, float, np.float64)
+    _supported_types = None # _supported_scalars and Dual, set below the class body
 
     def __init__(self, real, dual = 1):
         self.real = real 
         self.dual = dual 
 
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        map NumPy ufuncs (np.sin, np.multiply, ...) onto the derivative rules, see autodiff.ufunc
+        """
+        from autodiff.ufunc import array_ufunc # autodiff.ufunc imports this module
+        return array_ufunc(ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+        map NumPy functions (np.sum, np.dot, ...) onto vectorized rules, see autodiff.ufunc
+        """
+        from autodiff.ufunc import array_function
+        return array_function(func, types, args, kwargs)
+
     def __add__(self, other):
         """
         overload add operation
         """
 
-        if not isinstance(other, (*self._supported_scalars, Dual)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for Dual number operations')
         if isinstance(other, self._supported_scalars):
-            return Dual(self.real + other, self.dual)
+            return type(self)(self.real + other, self.dual)
         else:
-            return Dual(self.real + other.real, self.dual + other.dual)
+            return type(self)(self.real + other.real, self.dual + other.dual)
 
 
 
@@ -39,12 +134,12 @@ class Dual:
         """
         overload subtraction operation
         """
-        if not isinstance(other, (*self._supported_scalars, Dual)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for Dual number operations')
         if isinstance(other, self._supported_scalars):
-            return Dual(self.real - other, self.dual)
+            return type(self)(self.real - other, self.dual)
         else:
-            return Dual(self.real - other.real, self.dual - other.dual)
+            return type(self)(self.real - other.real, self.dual - other.dual)
 
 
 
@@ -52,19 +147,19 @@ class Dual:
         """
         overload reverse subtraction operation
         """
-        return Dual(other - self.real, -self.dual)
+        return type(self)(other - self.real, -self.dual)
 
 
     def __mul__(self, other): 
         """
         overwrite multiplication operation
         """
-        if not isinstance(other, (*self._supported_scalars, Dual)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for Dual number operations')
         if isinstance(other, self._supported_scalars):
-            return Dual(other*self.real, other*self.dual)
+            return type(self)(other*self.real, other*self.dual)
         else:
-            return Dual(self.real*other.real, self.dual*other.real + self.real*other.dual)
+            return type(self)(self.real*other.real, self.dual*other.real + self.real*other.dual)
 
 
 
@@ -81,7 +176,7 @@ class Dual:
         if not isinstance(other, self._supported_scalars):
             raise TypeError(f'Type not supported for Dual number operations')
         if isinstance(other, self._supported_scalars):
-            return Dual(self.real**other, other*self.real**(other - 1)*self.dual)
+            return type(self)(self.real**other, other*self.real**(other - 1)*self.dual)
         
     def __rpow__(self, other):
         """
@@ -90,30 +185,30 @@ class Dual:
         if not isinstance(other, self._supported_scalars):
             raise TypeError(f'Type not supported for Dual number operations')
         if isinstance(other, self._supported_scalars):
-            return Dual(other**self.real, np.log(other)*other**self.real*self.dual)
+            return type(self)(other**self.real, np.log(other)*other**self.real*self.dual)
 
     def __truediv__(self, other): 
         """
         Overload the division operator (/) to handle Dual class
         """
-        if not isinstance(other, (*self._supported_scalars, Dual)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for Dual number operations')
         if isinstance(other, self._supported_scalars):
-            return Dual(self.real/other,self.dual/other)
+            return type(self)(self.real/other,self.dual/other)
         else:
-            return Dual(self.real/other.real, self.dual/other.real - self.real*other.dual/other.real/other.real) 
+            return type(self)(self.real/other.real, self.dual/other.real - self.real*other.dual/other.real/other.real) 
 
     def __rtruediv__(self, other):
         """
         Overload the reverse division operator (/) to handle Dual class
         """
-        return Dual(other/self.real, -other*self.dual/self.real/self.real )
+        return type(self)(other/self.real, -other*self.dual/self.real/self.real )
 
     def __neg__(self):
         """
         Overload the negative operator to handle Dual class
         """         
-        return Dual(-self.real, -self.dual) 
+        return type(self)(-self.real, -self.dual) 
 
 
     def __neq__(self, other):
@@ -178,7 +273,77 @@ class Dual:
 
     def __eq__(self,other):
         if isinstance(other, Dual):
-            return (self.real == other.real and self.dual == other.dual)
+            return bool(self.real == other.real and np.all(self.dual == other.dual))
         return self.real == other
 
+Dual._supported_types = (*Dual._supported_scalars, Dual)
+
+
+class DualArray(Dual):
+    """
+    Batch of dual numbers whose real and dual parts are NumPy arrays.
+
+    Every operator of Dual and every function of autodiff.trig works elementwise, so the derivative
+    of a function at N sample points is obtained from one vectorized evaluation.
+
+    Example:
+    =======
+    z = DualArray(np.linspace(0, 1, 5))  # dual part defaults to ones
+    sin(z).dual == np.cos(z.real)
+    """
+
+    __slots__ = ()
+
+    _supported_scalars = (int, float, np.float64, np.ndarray)
+    _supported_types = (*_supported_scalars, Dual)
+
+    def __init__(self, real, dual = 1):
+        real = np.asarray(real, dtype=float)
+        dual = np.asarray(dual, dtype=float)
+        if dual.shape != real.shape:
+            dual = np.broadcast_to(dual, real.shape).copy()
+        self.real = real
+        self.dual = dual
+
+    @property
+    def shape(self):
+        """
+        Shape of the batch
+        """
+        return self.real.shape
+
+    def __len__(self):
+        """
+        Return number of dual numbers in the batch
+        """
+        return len(self.real)
+
+    def __getitem__(self, index):
+        """
+        Index into the batch; a single element is returned as a Dual
+        """
+        real, dual = self.real[index], self.dual[index]
+        if np.ndim(real) == 0:
+            return Dual(real, dual)
+        return DualArray(real, dual)
+
+    def __eq__(self, other):
+        """
+        Elementwise comparison of real and dual parts
+        """
+        if isinstance(other, Dual):
+            return (self.real == other.real) & (self.dual == other.dual)
+        return self.real == other
+
+    def __repr__(self):
+        """
+        Print class definition
+        """
+        return f'DualArray({self.real!r},{self.dual!r})'
+
+    def __str__(self):
+        """
+        prettier string representation
+        """
+        return f'Forward mode dual number array(real: {self.real}, dual: {self.dual})'
 
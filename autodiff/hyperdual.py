@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+"""Hyper-dual number implementation for exact second derivatives in AD forward mode.
+
+This module contains dunder methods to overload built-in Python operators.
+"""
+
+import numpy as np
+
+class HyperDual:
+    """
+    Hyper-dual number real + eps1*e1 + eps2*e2 + eps12*e1e2 with e1**2 = e2**2 = 0 and e1e2 != 0.
+
+    Seeding x with eps1 = p and eps2 = q gives f(x).eps1 = D_p f, f(x).eps2 = D_q f and f(x).eps12 = p^T H q,
+    exact to machine precision since no step size is involved.
+
+    Example:
+    =======
+    z = HyperDual(2.0, 1, 1, 0)
+    (z**3).eps12 == 6*2.0
+    """
+
+    __slots__ = ('real', 'eps1', 'eps2', 'eps12')
+
+    _supported_scalars = (int, float, np.float64)
+    _supported_types = None # _supported_scalars and HyperDual, set below the class body
+
+    def __init__(self, real, eps1 = 1, eps2 = 1, eps12 = 0):
+        self.real = real
+        self.eps1 = eps1
+        self.eps2 = eps2
+        self.eps12 = eps12
+
+    def _chain(self, f0, f1, f2):
+        """
+        Apply a function of one variable with value f0, first derivative f1 and second derivative f2 at self.real
+        """
+        return HyperDual(f0, f1*self.eps1, f1*self.eps2, f1*self.eps12 + f2*self.eps1*self.eps2)
+
+    def __add__(self, other):
+        """
+        overload add operation
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        if isinstance(other, self._supported_scalars):
+            return HyperDual(self.real + other, self.eps1, self.eps2, self.eps12)
+        else:
+            return HyperDual(self.real + other.real, self.eps1 + other.eps1, self.eps2 + other.eps2, self.eps12 + other.eps12)
+
+    def __radd__(self, other):
+        """
+        overload reverse add operation
+        """
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        """
+        overload subtraction operation
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        if isinstance(other, self._supported_scalars):
+            return HyperDual(self.real - other, self.eps1, self.eps2, self.eps12)
+        else:
+            return HyperDual(self.real - other.real, self.eps1 - other.eps1, self.eps2 - other.eps2, self.eps12 - other.eps12)
+
+    def __rsub__(self, other):
+        """
+        overload reverse subtraction operation
+        """
+        return -self.__sub__(other)
+
+    def __mul__(self, other):
+        """
+        overwrite multiplication operation
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        if isinstance(other, self._supported_scalars):
+            return HyperDual(other*self.real, other*self.eps1, other*self.eps2, other*self.eps12)
+        else:
+            return HyperDual(self.real*other.real,
+                             self.real*other.eps1 + self.eps1*other.real,
+                             self.real*other.eps2 + self.eps2*other.real,
+                             self.real*other.eps12 + self.eps1*other.eps2 + self.eps2*other.eps1 + self.eps12*other.real)
+
+    def __rmul__(self, other):
+        """
+        overwrite reverse multiplication operation
+        """
+        return self.__mul__(other)
+
+    def _reciprocal(self):
+        """
+        Return 1/self
+        """
+        inverse = 1/self.real
+        return self._chain(inverse, -inverse*inverse, 2*inverse*inverse*inverse)
+
+    def __truediv__(self, other):
+        """
+        Overload the division operator (/) to handle HyperDual class
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        if isinstance(other, self._supported_scalars):
+            return HyperDual(self.real/other, self.eps1/other, self.eps2/other, self.eps12/other)
+        else:
+            return self*other._reciprocal()
+
+    def __rtruediv__(self, other):
+        """
+        Overload the reverse division operator (/) to handle HyperDual class
+        """
+        if not isinstance(other, self._supported_scalars):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        return other*self._reciprocal()
+
+    def __pow__(self, other):
+        """
+        overwrite power law operation
+        """
+        if not isinstance(other, self._supported_scalars):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        # the terms with a zero coefficient are left out, so that x**1 and x**0 do not evaluate 0.0**(-1) at 0
+        first = 0.0 if other == 0 else other*self.real**(other - 1)
+        second = 0.0 if other*(other - 1) == 0 else other*(other - 1)*self.real**(other - 2)
+        return self._chain(self.real**other, first, second)
+
+    def __rpow__(self, other):
+        """
+        overwrite reverse power law operation
+        """
+        if not isinstance(other, self._supported_scalars):
+            raise TypeError(f'Type not supported for HyperDual number operations')
+        power = other**self.real
+        log = np.log(other)
+        return self._chain(power, log*power, log*log*power)
+
+    def __neg__(self):
+        """
+        Overload the negative operator to handle HyperDual class
+        """
+        return HyperDual(-self.real, -self.eps1, -self.eps2, -self.eps12)
+
+    def __lt__(self, other):
+        """
+        Overload the less than operator to handle HyperDual class
+        """
+        if isinstance(other, HyperDual):
+            return self.real < other.real
+        return self.real < other
+
+    def __gt__(self, other):
+        """
+        Overload the greater than operator to handle HyperDual class
+        """
+        if isinstance(other, HyperDual):
+            return self.real > other.real
+        return self.real > other
+
+    def __le__(self, other):
+        """
+        Overload the <= operator to handle HyperDual class
+        """
+        if isinstance(other, HyperDual):
+            return self.real <= other.real
+        return self.real <= other
+
+    def __ge__(self, other):
+        """
+        Overload the >= operator to handle HyperDual class
+        """
+        if isinstance(other, HyperDual):
+            return self.real >= other.real
+        return self.real >= other
+
+    def __eq__(self, other):
+        if isinstance(other, HyperDual):
+            return (self.real == other.real and self.eps1 == other.eps1 and
+                    self.eps2 == other.eps2 and self.eps12 == other.eps12)
+        return self.real == other
+
+    def __repr__(self):
+        """
+        Print class definition
+        """
+        return f'HyperDual({self.real},{self.eps1},{self.eps2},{self.eps12})'
+
+    def __str__(self):
+        """
+        prettier string representation
+        """
+        return f'Forward mode hyper-dual number object(real: {self.real}, eps1: {self.eps1}, eps2: {self.eps2}, eps12: {self.eps12})'
+
+HyperDual._supported_types = (*HyperDual._supported_scalars, HyperDual)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""Opt-in LRU memoization of derivative results keyed by the input point.
+
+A Memo passed to ForwardDiff or ReverseDiff stores the results of Jacobian by the bytes of the input array, so that
+line searches and trust-region methods revisiting a point get the stored result instead of rebuilding every Dual or
+Node. The least recently used entries are evicted beyond a number of entries or a number of bytes.
+"""
+
+import copy
+from collections import OrderedDict
+import numpy as np
+
+
+class Memo:
+    """
+    LRU cache of derivative results with hit and miss statistics.
+
+    Entries are keyed by the name of the method and the shape and bytes of the input as a float array, so equal
+    points hit whatever their type (list, tuple or array). Results are copied on the way out, so modifying a returned
+    Jacobian does not change the stored one. A Memo remembers results of one function: call clear() when the
+    parameters the function depends on change, and do not share a Memo between objects wrapping different functions.
+
+    Parameters
+    ==========
+    maxsize : largest number of entries, None for no limit
+    maxbytes : largest total size of the stored inputs and results in bytes, None for no limit
+
+    Example:
+    =======
+    memo = Memo(maxsize = 128)
+    obj = ReverseDiff(f, memo = memo)
+    obj.Jacobian(x); obj.Jacobian(x)
+    memo.hits == 1 and memo.misses == 1
+    memo.clear()   # after changing a parameter of f
+    """
+
+    def __init__(self, maxsize = 128, maxbytes = None):
+        if (maxsize is not None and maxsize < 0) or (maxbytes is not None and maxbytes < 0):
+            raise Exception('maxsize and maxbytes should be non-negative')
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0 # total size of the stored inputs and results
+        self._entries = OrderedDict() # key: (result, size in bytes), least recently used first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f'Memo(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, '
+                f'entries={len(self)}, nbytes={self.nbytes})')
+
+    @staticmethod
+    def key(name, x):
+        """
+        Key of the result of method name at the point x
+        """
+        x = np.ascontiguousarray(x, dtype = float)
+        return name, x.shape, x.tobytes()
+
+    def get(self, key, compute):
+        """
+        Return a copy of the result stored under key, or compute(), store it and return a copy
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry[0])
+        self.misses += 1
+        result = compute()
+        size = len(key[2]) + np.asarray(result).nbytes
+        if (self.maxsize is None or self.maxsize > 0) and (self.maxbytes is None or size <= self.maxbytes):
+            self._entries[key] = (copy.deepcopy(result), size)
+            self.nbytes += size
+            self._evict()
+        return result
+
+    def clear(self):
+        """
+        Invalidate every entry, e.g. after a parameter of the function changed. The statistics are kept.
+        """
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _evict(self):
+        while ((self.maxsize is not None and len(self._entries) > self.maxsize) or
+               (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+            _, (_, size) = self._entries.popitem(last = False)
+            self.nbytes -= size
+            self.evictions += 1
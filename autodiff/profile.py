@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+"""Opt-in instrumentation of graph construction and sweeps.
+
+Profile is a context manager which, while active, replaces the methods of Node, Tape and Dual with counting and
+timing wrappers, and puts the original methods back on exit. Nothing is wrapped outside of the with block, so the
+instrumentation costs nothing when it is not used.
+"""
+
+import sys
+from collections import Counter, defaultdict
+from time import perf_counter
+from autodiff.dual import Dual, DualArray
+from autodiff.reverse import Node, Tape
+
+# operator method: op key, for Dual objects allocated inside Dual operators
+_DUNDER = {
+    '__add__': 'add', '__radd__': 'add', '__sub__': 'sub', '__rsub__': 'rsub', '__mul__': 'mul', '__rmul__': 'mul',
+    '__truediv__': 'div', '__rtruediv__': 'rdiv', '__pow__': 'pow', '__rpow__': 'rpow', '__neg__': 'neg',
+}
+
+PHASES = ('construct', 'eval', 'sweep', 'reset')
+
+
+def _delegated(name):
+    """
+    Comprehensions and private helpers (such as the dispatch of autodiff.trig) allocate on behalf of their caller
+    """
+    return name in ('<listcomp>', '<genexpr>', '<dictcomp>') or (name.startswith('_') and not name.endswith('__') and name != '_eval')
+
+
+class Profile:
+    """
+    Record, per op key (add, mul, sin, ...), the number of Node objects created, the number of Dual objects allocated
+    and the wall time of every phase, together with the peak graph size.
+
+    Phases:
+    construct: Node.__init__ without the eager _eval
+    eval: Node._eval (value and partials of a new node)
+    sweep: Node._propagate (reverse pass, from Tape.backward, Tape.backward_many or Node._sens)
+    reset: Tape.reset and Node._reset, recorded under the key '*'
+
+    Leaf nodes are counted under the key 'leaf'. Dual objects allocated outside of an operator or elementary function
+    are counted under the name of the allocating function (e.g. 'Jacobian' for the seeds of ForwardDiff.Jacobian).
+
+    Example:
+    =======
+    with Profile() as profile:
+        ReverseDiff(f).Jacobian(x)
+    profile.nodes['sin'], profile.times['sweep']['mul'], profile.peak_graph
+    print(profile.report())
+    """
+
+    def __init__(self):
+        self.nodes = Counter() # key: Node objects created
+        self.duals = Counter() # key: Dual objects allocated
+        self.times = {phase: defaultdict(float) for phase in PHASES} # phase: {key: seconds}
+        self.peak_graph = 0 # largest recorded tape or swept graph, in nodes
+        self._saved = None
+        self._current = None # key of the node being evaluated
+        self._eval_time = 0.0
+
+    def __enter__(self):
+        wrappers = ((Node, '__init__', self._wrap_node_init), (Node, '_eval', self._wrap_eval),
+                    (Node, '_propagate', self._wrap_propagate), (Node, '_topo', self._wrap_topo),
+                    (Node, '_reset', self._wrap_reset), (Tape, 'reset', self._wrap_reset),
+                    (Tape, 'backward_many', self._wrap_backward_many),
+                    (Dual, '__init__', self._wrap_dual_init), (DualArray, '__init__', self._wrap_dual_init))
+        self._saved = []
+        for cls, name, wrap in wrappers:
+            method = cls.__dict__[name]
+            self._saved.append((cls, name, method))
+            setattr(cls, name, wrap(method))
+        return self
+
+    def __exit__(self, *exc_info):
+        for cls, name, method in reversed(self._saved):
+            setattr(cls, name, method)
+        self._saved = None
+
+    def phase_time(self, phase):
+        """
+        Total wall time of a phase in seconds
+        """
+        return sum(self.times[phase].values())
+
+    def report(self):
+        """
+        Return a table of the counters and timings per op key
+        """
+        keys = sorted(set(self.nodes) | set(self.duals) | {key for phase in PHASES for key in self.times[phase]}, key = str)
+        lines = [f'{"op":<12}{"nodes":>10}{"duals":>10}' + ''.join(f'{phase + " [us]":>16}' for phase in PHASES)]
+        for key in keys:
+            lines.append(f'{str(key):<12}{self.nodes[key]:>10}{self.duals[key]:>10}' +
+                         ''.join(f'{self.times[phase].get(key, 0.0)*1e6:>16.1f}' for phase in PHASES))
+        lines.append(f'{"total":<12}{sum(self.nodes.values()):>10}{sum(self.duals.values()):>10}' +
+                     ''.join(f'{self.phase_time(phase)*1e6:>16.1f}' for phase in PHASES))
+        lines.append(f'peak graph size: {self.peak_graph} nodes')
+        return '\n'.join(lines)
+
+    def _wrap_node_init(self, init):
+        def __init__(node, key, **kwargs):
+            self._eval_time = 0.0
+            start = perf_counter()
+            init(node, key, **kwargs)
+            elapsed = perf_counter() - start
+            op = node.key if node.left is not None else 'leaf'
+            self.nodes[op] += 1
+            self.times['construct'][op] += elapsed - self._eval_time
+            if Node._tape is not None and len(Node._tape) > self.peak_graph:
+                self.peak_graph = len(Node._tape)
+        return __init__
+
+    def _wrap_dual_init(self, init):
+        def __init__(dual, *args, **kwargs):
+            init(dual, *args, **kwargs)
+            frame = sys._getframe(1)
+            while _delegated(frame.f_code.co_name) and frame.f_back is not None:
+                frame = frame.f_back
+            name = frame.f_code.co_name
+            self.duals[self._current if name == '_eval' else _DUNDER.get(name, name)] += 1
+        return __init__
+
+    def _wrap_eval(self, _eval):
+        def wrapper(node):
+            op = node.key if node.left is not None else 'leaf'
+            outer, self._current = self._current, op
+            start = perf_counter()
+            try:
+                return _eval(node)
+            finally:
+                self._eval_time = perf_counter() - start
+                self.times['eval'][op] += self._eval_time
+                self._current = outer
+        return wrapper
+
+    def _wrap_propagate(self, _propagate):
+        def wrapper(node):
+            start = perf_counter()
+            _propagate(node)
+            self.times['sweep'][node.key if node.left is not None else 'leaf'] += perf_counter() - start
+        return wrapper
+
+    def _wrap_topo(self, _topo):
+        def wrapper(node):
+            order = _topo(node)
+            self.peak_graph = max(self.peak_graph, len(order))
+            return order
+        return wrapper
+
+    def _wrap_reset(self, reset):
+        def wrapper(obj):
+            start = perf_counter()
+            reset(obj)
+            self.times['reset']['*'] += perf_counter() - start
+        return wrapper
+
+    def _wrap_backward_many(self, backward_many):
+        def wrapper(tape, outputs, seeds):
+            self.peak_graph = max(self.peak_graph, len(tape))
+            return backward_many(tape, outputs, seeds)
+        return wrapper
@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 import numpy as np
-from autodiff.dual import Dual
+from autodiff.dual import Dual, _UfuncMethods
+from autodiff.rules import ELEMENTARY
 
-class Node:
+class _NodeType(type):
+    """
+    Metaclass of Node. It adds nothing by itself: Intern sets its __call__ while interning is active,
+    so that creating a Node can return an existing one, and removes it again on exit.
+    """
+
+
+class Node(_UfuncMethods, metaclass = _NodeType):
     """
     Node class to implement the reverse mode auto differentiation. Elementary operations are overloaded to create the tree structure
     to represent the function. A forward pass process is implemented in the _
     """
+    __slots__ = ('key', 'left', 'right', 'value', 'left_partial', 'right_partial', 'operation', 'constant', 'sensitivity', 'active', 'live')
+
     _supported_scalars = (int, float, np.float64)
+    _supported_types = None # _supported_scalars and Node, set below the class body
+    _tape = None # list recording every new node while a Tape is active
+    _trace = None # while ReverseDiff traces f: (ids of the input leaves, other leaves made inactive by the trace)
 
-    def __init__(self, key, *, value = None, left_partial = None , right_partial = None, operation = None, left = None, right = None, sensitivity = 0):
+    def __init__(self, key, *, value = None, left_partial = None , right_partial = None, operation = None, left = None, right = None, constant = None, sensitivity = 0, active = True):
         self.key = key
         self.left = left
         self.right = right
@@ -17,24 +30,45 @@ class Node:
         self.left_partial = left_partial  ## save partial at the self level is not the best choice. => does not account for recycled nodes unless leaf nodes are redefined 
         self.right_partial = right_partial
         self.operation = operation # the elementary operation performed at each node
+        self.constant = constant # scalar operand of the operation, when the node has a single child
         self.sensitivity = sensitivity
+        if left is None:
+            self.active = active # leaves are independent variables unless created with active = False
+        elif Node._trace is not None and self._fold_leaves(left, right):
+            self._fold()
+        elif left.active and (right is None or right.active):
+            self.active = True
+        else:
+            self._fold()
         self._eval()
+        if Node._tape is not None and self.active:
+            Node._tape.append(self)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        map NumPy ufuncs (np.sin, np.multiply, ...) onto the derivative rules, see autodiff.ufunc
+        """
+        from autodiff.ufunc import array_ufunc # autodiff.ufunc imports this module
+        return array_ufunc(ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+        map NumPy functions (np.sum, np.dot, ...) onto their NumPy implementation, see autodiff.ufunc
+        """
+        from autodiff.ufunc import array_function
+        return array_function(func, types, args, kwargs)
 
 
     def __add__(self, other):
         """
         overload addition operation
         """
-        #self.partial = 1 #### Calculate partial at the creation step will not work for sin, cos, etc!!!
-        #other.partial = 1
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         if isinstance(other, self._supported_scalars):
-            operation = lambda x: x + other
-            return Node('add', left = self, right = None, operation = operation)
+            return Node('add', left = self, right = None, constant = other)
         else:
-            operation = lambda x,y: x+y 
-            return Node('add', left = self, right = other, operation = operation)
+            return Node('add', left = self, right = other)
 
     def __radd__(self, other): 
         """
@@ -43,36 +77,34 @@ class Node:
         return self.__add__(other) 
 
     def __sub__(self, other):
-        
-        #self.partial = 1
-        #other.partial = -1
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        """
+        overload subtraction operation
+        """
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         if isinstance(other, self._supported_scalars):
-            operation = lambda x: x - other
-            return Node('sub', left = self, right = None, operation = operation)
+            return Node('sub', left = self, right = None, constant = other)
         else:
-            operation = lambda x,y: x-y 
-            return Node('sub', left = self, right = other, operation = operation)
+            return Node('sub', left = self, right = other)
 
     def __rsub__(self, other): 
         """
         overload reverse subtraction operation
         """
-        return -self.__sub__(other) 
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for reverse mode auto differentiation')
+        return Node('rsub', left = self, right = None, constant = other)
 
     def __mul__(self, other):
-        
-        #self.partial = other.value
-        #other.partial = self.value
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        """
+        overload multiplication operation
+        """
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         if isinstance(other, self._supported_scalars):
-            operation = lambda x: x*other
-            return Node('mul', left = self, right = None, operation = operation)
+            return Node('mul', left = self, right = None, constant = other)
         else:
-            operation = lambda x,y: x*y 
-            return Node('mul', left = self, right = other, operation = operation)
+            return Node('mul', left = self, right = other)
 
     def __rmul__(self, other): 
         """
@@ -84,58 +116,54 @@ class Node:
         """
         overload division operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         if isinstance(other, self._supported_scalars):
-            operation = lambda x: x/other
-            return Node('div', left = self, right = None, operation = operation)
+            return Node('div', left = self, right = None, constant = other)
         else:
-            operation = lambda x,y: x/y
-            return Node('div', left = self, right = other, operation = operation)
+            return Node('div', left = self, right = other)
 
     def __rtruediv__(self, other): 
         """
         overload reverse division operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         else: 
-            operation = lambda x: other/x
-            return Node('div', left = self, right = None, operation = operation)
+            return Node('rdiv', left = self, right = None, constant = other)
  
     def __pow__(self, other):
         """
         overload the power operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         if isinstance(other, self._supported_scalars):
-            operation = lambda x: x**other
-            return Node('pow', left = self, right = None, operation = operation)
+            return Node('pow', left = self, right = None, constant = other)
         else:
-            operation = lambda x,y: x**y
-            return Node('pow', left = self, right = other, operation = operation)
+            return Node('pow', left = self, right = other)
 
     def __rpow__(self, other):
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        """
+        overload the reverse power operation
+        """
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         else: 
-            operation = lambda x: other**x
-            return Node('exp', left = self, right = None, operation = operation)
+            return Node('rpow', left = self, right = None, constant = other)
 
     def __neg__(self):
         """
         overload the unary negation operation
         """
-        operation = lambda x: -x
-        return Node('neg', left = self, right = None, operation = operation)
+        return Node('neg', left = self, right = None)
 
 
     def __lt__(self, other):
         """
         overload the < operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         elif isinstance(other, Node):
             return self.value < other.value
@@ -146,7 +174,7 @@ class Node:
         """
         overload the > operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         elif isinstance(other, Node):
             return self.value > other.value
@@ -157,7 +185,7 @@ class Node:
         """
         overload the = operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         elif isinstance(other, Node):
             return self.value == other.value and self.sensitivity == other.sensitivity
@@ -168,7 +196,7 @@ class Node:
         """
         overload the != operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         elif isinstance(other, Node):
             return self.value != other.value or self.sensitivity != other.sensitivity
@@ -180,7 +208,7 @@ class Node:
         """
         overload the <= operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         elif isinstance(other, Node):
             return self.value <= other.value
@@ -191,7 +219,7 @@ class Node:
         """
         overload the >= operation
         """
-        if not isinstance(other, (*self._supported_scalars, Node)):
+        if not isinstance(other, self._supported_types):
             raise TypeError(f'Type not supported for reverse mode auto differentiation')
         elif isinstance(other, Node):
             return self.value >= other.value
@@ -204,7 +232,9 @@ class Node:
     def _eval(self):
         """
         Forward pass of the reverse mode auto differentiation.
-        Calculate the value of all nodes of the tree, as well as the partial derivative of the current node wrt all child nodes.
+        Calculate the value of the current node, as well as the partial derivatives of the current node wrt its child nodes,
+        in one step from the derivative rule of its key (see _UNARY and _BINARY).
+        Nodes with a key without a rule fall back to evaluating their operation on dual numbers.
         """
         
         if (self.left is None) and (self.right is None):
@@ -212,58 +242,109 @@ class Node:
         elif self.value is not None:
             return self.value
         elif self.right is None:
-            dual = self.operation(Dual(self.left._eval()))   # real part evaluates the current node, dual part evaluates the partial derivative
-            self.value = dual.real
-            self.left_partial = dual.dual
+            rule = _UNARY.get(self.key)
+            if rule is not None:
+                self.value, self.left_partial = rule(self.left.value, self.constant)
+            else:
+                dual = self.operation(Dual(self.left.value))   # real part evaluates the current node, dual part evaluates the partial derivative
+                self.value = dual.real
+                self.left_partial = dual.dual
             return self.value
         else: 
-            self.left._eval()
-            self.right._eval()
-            dual1 = Dual(self.left.value, 1)
-            dual2 = Dual(self.right.value, 0)
-            dual = self.operation(dual1, dual2)
-            self.value = dual.real
-            self.left_partial = dual.dual
-            self.right_partial = self.operation(Dual(self.left.value, 0), Dual(self.right.value, 1)).dual
+            rule = _BINARY.get(self.key)
+            if rule is not None:
+                self.value, self.left_partial, self.right_partial = rule(self.left.value, self.right.value)
+            else:
+                dual = self.operation(Dual(self.left.value, 1), Dual(self.right.value, 0))
+                self.value = dual.real
+                self.left_partial = dual.dual
+                self.right_partial = self.operation(Dual(self.left.value, 0), Dual(self.right.value, 1)).dual
             return self.value
 
 
     
+    @staticmethod
+    def _fold_leaves(left, right):
+        """
+        Inside a trace, make the active leaves among the children which are not inputs of the trace inactive, e.g. a
+        Node created before the trace and used as a parameter by f, so that they are folded as constants instead of
+        accumulating sensitivities outside the tape. The trace makes them active again when it ends.
+        Return whether a child is inactive.
+        """
+        inputs, inactivated = Node._trace
+        for child in (left, right):
+            if child is not None and child.left is None and child.active and id(child) not in inputs:
+                child.active = False
+                inactivated.append(child)
+        return not left.active or (right is not None and not right.active)
+
+    def _fold(self):
+        """
+        Constant folding of a node with an inactive child, i.e. a child which does not depend on any active leaf.
+        If no child is active, the node is inactive as well: its value is computed once and it becomes a constant leaf,
+        so it takes no part in the reverse pass. Otherwise the inactive child becomes the scalar operand of the node.
+        """
+        left, right = self.left, self.right
+        self.active = (left.active or right.active) if right is not None else left.active
+        if not self.active:
+            self._eval()
+            self.left = self.right = self.operation = self.constant = None
+            self.left_partial = self.right_partial = None
+        elif not right.active and self.key in _UNARY:
+            self.right, self.constant = None, right.value
+        elif not left.active and self.key in _REFLECTED:
+            self.key, self.left, self.right, self.constant = _REFLECTED[self.key], right, None, left.value
+
+    def _topo(self):
+        """
+        Return every node of the graph below (and including) the current node exactly once, in topological order:
+        children always come before their parents, so the current node is the last element.
+        The graph is walked with an explicit stack, so deep graphs do not hit the recursion limit.
+        """
+        order = []
+        visited = set()
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            stack.append((node, True))
+            for child in (node.right, node.left):
+                if child is not None and id(child) not in visited:
+                    stack.append((child, False))
+        return order
+
+    def _propagate(self):
+        """
+        Push the sensitivity (adjoint) of the current node to its child nodes.
+        Must only be called once all parents of the current node have been propagated.
+        """
+        if self.left is not None:
+            self.left.sensitivity += self.sensitivity*self.left_partial
+        if self.right is not None:
+            self.right.sensitivity += self.sensitivity*self.right_partial
+
     def _sens(self):
         """
         Reverse pass of the reverse mode auto differentiation.
-        Calculate the sensitivity (adjoint) of all child nodes with respect to the current node 
+        Calculate the sensitivity (adjoint) of all child nodes with respect to the current node.
+        Each node is visited once, in reverse topological order, so shared subexpressions are not walked repeatedly.
         """
-        
-        if (self.left is None) and (self.right is None):
-            pass
-        elif self.right is None:
-            self.left.sensitivity += self.sensitivity*self.left_partial
-            self.left._sens()
-        else: 
-            self.left.sensitivity += self.sensitivity*self.left_partial
-            self.right.sensitivity += self.sensitivity*self.right_partial
-            self.left._sens()
-            self.right._sens()
+        for node in reversed(self._topo()):
+            node._propagate()
 
     def _reset(self):
         """
-        Reset the sensitivty of leaf nodes too zero to allow the reverse mode auto differentiation of the next component of a vector function.
-        Calculate the sensitivity (adjoint) of all child nodes with respect to the current node 
+        Reset the sensitivty of all child nodes to zero to allow the reverse mode auto differentiation of the next component of a vector function.
         """
-        
-        if (self.left is None) and (self.right is None):
-            pass
-
-        elif self.right is None:
-            self.left.sensitivity = 0
-            self.left._reset()
-        else: 
-            self.left.sensitivity = 0
-            self.right.sensitivity = 0 
-            self.left._reset()
-            self.right._reset()
-
+        order = self._topo()
+        order.pop() # the current node is last; its sensitivity is seeded by the caller
+        for node in order:
+            node.sensitivity = 0
 
 
     @staticmethod
@@ -276,3 +357,181 @@ class Node:
         return f'{node.key}({node._pretty(node.left)}, {node._pretty(node.right)})' + f': value = {node.value}'
 
 
+Node._supported_types = (*Node._supported_scalars, Node)
+
+
+def _outputs(tree):
+    """
+    Split the value returned by f into (list of outputs, whether f is scalar): a Node or a constant is a scalar
+    output, a list, a tuple or a NumPy array of them (e.g. np.exp(W @ x)) a vector of outputs
+    """
+    if isinstance(tree, np.ndarray):
+        if tree.ndim == 0:
+            return [tree[()]], True
+        return list(tree.ravel()), False
+    if isinstance(tree, (list, tuple)):
+        return list(tree), False
+    return [tree], True
+
+
+def _rpow(a, c):
+    power = c**a
+    return power, np.log(c)*power
+
+
+# Derivative rules of nodes with one child: key: (a, constant) -> (value, partial wrt a)
+_UNARY = {
+    'add': lambda a, c: (a + c, 1),
+    'sub': lambda a, c: (a - c, 1),
+    'rsub': lambda a, c: (c - a, -1),
+    'mul': lambda a, c: (a*c, c),
+    'div': lambda a, c: (a/c, 1/c),
+    'rdiv': lambda a, c: (c/a, -c/(a*a)),
+    'pow': lambda a, c: (a**c, c*a**(c - 1)),
+    'rpow': _rpow,
+    'neg': lambda a, c: (-a, -1),
+}
+_UNARY.update({key: rule for key, (value, rule, second) in ELEMENTARY.items()}) # shared with autodiff.trig
+
+# Derivative rules of nodes with two children: key: (a, b) -> (value, partial wrt a, partial wrt b)
+_BINARY = {
+    'add': lambda a, b: (a + b, 1, 1),
+    'sub': lambda a, b: (a - b, 1, -1),
+    'mul': lambda a, b: (a*b, b, a),
+    'div': lambda a, b: (a/b, 1/b, -a/(b*b)),
+    'pow': lambda a, b: (a**b, b*a**(b - 1), np.log(a)*a**b),
+}
+
+# Key of the node with one child computing the same value as a binary node whose left child is a constant
+_REFLECTED = {'add': 'add', 'sub': 'rsub', 'mul': 'mul', 'div': 'rdiv', 'pow': 'rpow'}
+
+
+class Tape:
+    """
+    Record every Node created inside a ``with`` block, in creation order.
+
+    A node can only be built from nodes that already exist, so the creation order is a topological order of the graph.
+    Sweeping the recorded list backwards visits each node exactly once, without recursion.
+
+    Example:
+    =======
+    with Tape() as tape:
+        x = Node('x', value = 2)
+        y = x*x
+    tape.backward(y)  # x.sensitivity == 4
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self._outer = None
+
+    def __enter__(self):
+        self._outer = Node._tape
+        Node._tape = self.nodes
+        return self
+
+    def __exit__(self, *exc_info):
+        Node._tape = self._outer
+        if self._outer is not None:
+            self._outer.extend(self.nodes) # keep an enclosing tape complete
+        self._outer = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def reset(self):
+        """
+        Set the sensitivity of every recorded node to zero.
+        """
+        for node in self.nodes:
+            node.sensitivity = 0
+            node.live = False # set by backward_many on the nodes the outputs depend on
+
+    def backward(self, output, seed = 1):
+        """
+        Reverse pass over the tape: seed the output node with sensitivity seed (default 1) and propagate it to every recorded node.
+        """
+        self.backward_many([output], [seed])
+
+    def backward_many(self, outputs, seeds):
+        """
+        Reverse pass over the tape seeded at several output nodes at once: the sensitivity of outputs[i] starts at seeds[i].
+        After a single sweep the sensitivity of every node is sum_i seeds[i] * d outputs[i] / d node.
+        Outputs which are not Node objects (constants) are ignored.
+        Only the nodes the outputs depend on are propagated: the outputs are marked live, and every propagated node
+        marks its children, which the reverse creation order visits later. Dead nodes (no output uses them) cost one
+        attribute test, whatever the type of the seeds, and an infinite partial of a dead node, such as sqrt at 0,
+        does not turn into 0*inf = nan.
+        """
+        self.reset()
+        for output, seed in zip(outputs, seeds):
+            if isinstance(output, Node):
+                output.sensitivity += seed
+                output.live = True
+        for node in reversed(self.nodes):
+            if node.live:
+                node._propagate()
+                left, right = node.left, node.right
+                if left is not None:
+                    left.live = True
+                    if right is not None: # a node with a right child has a left child
+                        right.live = True
+
+
+class Intern:
+    """
+    Hash-consing of Node objects created inside a ``with`` block.
+
+    Creating a node with the same key, the same children (by identity), the same constant and the same operation as
+    a node created earlier in the block, on the same tape, returns the earlier node instead of a new one. Repeated
+    subexpressions such as sin(x)*sin(x) + sin(x) then share one node, which is evaluated and swept once.
+    Leaf nodes are never merged. Outside of the block Node construction is not affected at all.
+    A lookup costs about as much as building a cheap node, so interning pays off when the graph is kept and swept
+    many times, e.g. when f is traced for ReverseDiff.compile or ReverseDiff.generate.
+
+    Example:
+    =======
+    with Intern() as intern:
+        ReverseDiff(lambda x: sin(x[0])*sin(x[0]) + sin(x[0])).Jacobian([0.5])
+    intern.deduplicated == 2
+    """
+
+    def __init__(self):
+        self.nodes = {} # (key, id(left), id(right), constant, operation): (tape of the node, node, left, right)
+        self.deduplicated = 0 # number of node creations answered with an existing node
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = _NodeType.__dict__.get('__call__')
+        create = self._saved or type.__call__ # an enclosing Intern, or plain construction
+        nodes = self.nodes
+
+        def __call__(cls, key, **kwargs):
+            left = kwargs.get('left')
+            if left is None:
+                return create(cls, key, **kwargs)
+            signature = (key, id(left), id(kwargs.get('right')), kwargs.get('constant'), kwargs.get('operation'))
+            try:
+                entry = nodes.get(signature)
+            except TypeError: # unhashable constant
+                return create(cls, key, **kwargs)
+            if entry is not None and entry[0] is Node._tape:
+                self.deduplicated += 1
+                return entry[1]
+            node = create(cls, key, **kwargs)
+            # the entry keeps the children alive, so their ids stay unique: constant folding may drop them from the node
+            nodes[signature] = (Node._tape, node, left, kwargs.get('right'))
+            return node
+
+        _NodeType.__call__ = __call__
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._saved is None:
+            del _NodeType.__call__
+        else:
+            _NodeType.__call__ = self._saved
+        self._saved = None
+
+    def __len__(self):
+        return len(self.nodes)
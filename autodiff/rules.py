@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""Derivative rules of the elementary functions.
+
+One table for every number type: plain scalars and arrays only use the value, Dual and Node the value together with
+the first derivative, HyperDual also the second derivative. autodiff.trig dispatches on the type of the argument and
+autodiff.reverse uses the same rules for Node objects.
+
+Every rule is a function of the argument a and of the parameter c of the function ((loc, scale) for logist,
+None for the others). The second derivative also receives the value v of the function at a.
+"""
+
+import numpy as np
+
+_LOG2 = np.log(2)
+_LOG10 = np.log(10)
+
+
+def _exp(a, c):
+    e = np.exp(a)
+    return e, e
+
+def _tan(a, c):
+    cos = np.cos(a)
+    return np.tan(a), 1/(cos*cos)
+
+def _tanh(a, c):
+    cosh = np.cosh(a)
+    return np.tanh(a), 1/(cosh*cosh)
+
+def _sqrt(a, c):
+    root = np.sqrt(a)
+    return root, 0.5/root
+
+def _logist(a, c):
+    loc, scale = c
+    e = np.exp((loc - a)/scale)
+    return e/(scale*(1 + e)**2)
+
+def _logist_rule(a, c):
+    loc, scale = c
+    e = np.exp((loc - a)/scale)
+    d = scale*(1 + e)**2
+    value = e/d
+    return value, value/d*(-d/scale + 2*(1 + e)*e) # quotient rule, with de/da = -e/scale and dd/da = -2*(1 + e)*e
+
+
+# key: (value(a, c), rule(a, c) -> (value, derivative), second derivative(a, v, c))
+# logist has no second derivative: hyper-dual numbers compose it from exp
+ELEMENTARY = {
+    'sin': (lambda a, c: np.sin(a), lambda a, c: (np.sin(a), np.cos(a)), lambda a, v, c: -v),
+    'cos': (lambda a, c: np.cos(a), lambda a, c: (np.cos(a), -np.sin(a)), lambda a, v, c: -v),
+    'tan': (lambda a, c: np.tan(a), _tan, lambda a, v, c: 2*v/np.cos(a)**2),
+    'log': (lambda a, c: np.log(a), lambda a, c: (np.log(a), 1/a), lambda a, v, c: -1/(a*a)),
+    'log2': (lambda a, c: np.log2(a), lambda a, c: (np.log2(a), 1/(a*_LOG2)), lambda a, v, c: -1/(a*a*_LOG2)),
+    'log10': (lambda a, c: np.log10(a), lambda a, c: (np.log10(a), 1/(a*_LOG10)), lambda a, v, c: -1/(a*a*_LOG10)),
+    'sinh': (lambda a, c: np.sinh(a), lambda a, c: (np.sinh(a), np.cosh(a)), lambda a, v, c: v),
+    'cosh': (lambda a, c: np.cosh(a), lambda a, c: (np.cosh(a), np.sinh(a)), lambda a, v, c: v),
+    'tanh': (lambda a, c: np.tanh(a), _tanh, lambda a, v, c: -2*v/np.cosh(a)**2),
+    'exp': (lambda a, c: np.exp(a), _exp, lambda a, v, c: v),
+    'sqrt': (lambda a, c: np.sqrt(a), _sqrt, lambda a, v, c: -0.25/(a*v)),
+    'arcsin': (lambda a, c: np.arcsin(a), lambda a, c: (np.arcsin(a), 1/np.sqrt(1 - a*a)), lambda a, v, c: a/(1 - a*a)**1.5),
+    'arccos': (lambda a, c: np.arccos(a), lambda a, c: (np.arccos(a), -1/np.sqrt(1 - a*a)), lambda a, v, c: -a/(1 - a*a)**1.5),
+    'arctan': (lambda a, c: np.arctan(a), lambda a, c: (np.arctan(a), 1/(1 + a*a)), lambda a, v, c: -2*a/(1 + a*a)**2),
+    'logist': (_logist, _logist_rule, None),
+}
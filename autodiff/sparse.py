@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""Sparse Jacobians for forward mode AD.
+
+The sparsity pattern of the Jacobian is detected by tracing the dependencies of every output on the inputs
+through a Node graph. Columns which never have a nonzero in the same row (structurally orthogonal columns)
+get the same color, and all columns of one color share one tangent direction, so a Jacobian with c colors
+comes out of a single evaluation with c tangents instead of n.
+"""
+
+import numpy as np
+from autodiff.dual import Dual
+from autodiff.reverse import Node, Tape, _outputs
+
+
+def sparsity_pattern(f, x):
+    """
+    Parameters
+    ==========
+    f : function of the vector x, written for ForwardDiff (it receives a single value when len(x) == 1)
+    x : point at which the dependencies are traced
+
+    Returns
+    =======
+    list with, for every output of f, the sorted indices of the inputs it depends on
+
+    The pattern is the one of the branch taken at x if f branches on the values of its inputs.
+    Dependencies are propagated along the recorded tape as bitsets (Python ints), bit k standing for input k.
+    """
+    with Tape() as tape:
+        inputs = [Node(1-k, value = x[k]) for k in range(len(x))]
+        outputs = f(inputs[0] if len(x) == 1 else inputs)
+
+    dependencies = {id(node): 1 << k for k, node in enumerate(inputs)}
+    for node in tape.nodes:
+        if node.left is None:
+            continue
+        bits = dependencies.get(id(node.left), 0)
+        if node.right is not None:
+            bits |= dependencies.get(id(node.right), 0)
+        dependencies[id(node)] = bits
+
+    outputs = _outputs(outputs)[0]
+    pattern = []
+    for output in outputs:
+        bits = dependencies.get(id(output), 0) if isinstance(output, Node) else 0
+        row = []
+        while bits:
+            lowest = bits & -bits
+            row.append(lowest.bit_length() - 1)
+            bits ^= lowest
+        pattern.append(row)
+    return pattern
+
+
+def color_columns(pattern, n):
+    """
+    Parameters
+    ==========
+    pattern : for every row, the indices of its nonzero columns (see sparsity_pattern)
+    n : number of columns
+
+    Returns
+    =======
+    list with the color of every column, such that two columns with a nonzero in the same row never share a color
+
+    Greedy coloring, columns with the most nonzeros first.
+    """
+    rows_of = [[] for _ in range(n)]
+    for i, row in enumerate(pattern):
+        for j in row:
+            rows_of[j].append(i)
+
+    colors = [-1] * n
+    for j in sorted(range(n), key = lambda j: -len(rows_of[j])):
+        forbidden = {colors[k] for i in rows_of[j] for k in pattern[i]}
+        color = 0
+        while color in forbidden:
+            color += 1
+        colors[j] = color
+    return colors
+
+
+def compressed_Jacobian(f, x, colors):
+    """
+    Return the compressed Jacobian B = J @ S, where S[j, colors[j]] = 1, from a single evaluation of f
+    with one tangent direction per color.
+    """
+    n_colors = max(colors) + 1 if colors else 0
+    seeds = np.zeros((len(x), n_colors))
+    seeds[np.arange(len(x)), colors] = 1
+    if len(x) == 1:
+        z = Dual(x[0], seeds[0])
+    else:
+        z = [Dual(x[j], seeds[j]) for j in range(len(x))]
+
+    fz = _outputs(f(z))[0]
+    return np.array([fz_i.dual if type(fz_i) is Dual else np.zeros(n_colors) for fz_i in fz]).reshape(len(fz), n_colors)
+
+
+def decompress(compressed, pattern, colors, n):
+    """
+    Recover the nonzeros of the Jacobian from its compressed form, as a scipy.sparse.csr_matrix
+    """
+    try:
+        from scipy.sparse import csr_matrix
+    except ImportError:
+        raise ImportError('sparse Jacobians are returned as scipy.sparse matrices, install scipy to use them')
+
+    indptr = np.zeros(len(pattern) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in pattern])
+    indices = np.fromiter((j for row in pattern for j in row), dtype=np.int64, count=indptr[-1])
+    rows = np.repeat(np.arange(len(pattern)), np.diff(indptr))
+    data = compressed[rows, np.asarray(colors, dtype=np.int64)[indices]] if len(indices) else np.zeros(0)
+    return csr_matrix((data, indices, indptr), shape=(len(pattern), n))
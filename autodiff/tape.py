@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+"""Compiled tape for reverse mode AD.
+
+A function is traced once into a flat list of instructions; forward and reverse sweeps can then be replayed
+for new input vectors without calling the function again or allocating Node objects.
+"""
+
+from autodiff.dual import Dual
+from autodiff.reverse import Node, _UNARY, _BINARY, _outputs
+
+
+class CompiledTape:
+    """
+    Flat instruction tape recorded from a Node graph.
+
+    Every node of the traced graph owns a slot in a value array. Leaf nodes are either independent variables
+    (filled from the input vector on every call) or constants (keep their traced value). Every other node becomes
+    an instruction (slot, derivative rule, left slot, right slot, constant), stored in topological order.
+
+    The graph is fixed at trace time: if f branches on the values of its inputs, the tape replays the branch
+    taken at the traced point.
+
+    Example:
+    =======
+    tape = ReverseDiff(f).compile(x0)
+    for x in iterates:
+        J = tape.Jacobian(x)
+    """
+
+    def __init__(self, tape, inputs, outputs):
+        """
+        Parameters
+        ==========
+        tape : Tape recorded while evaluating f
+        inputs : Node objects of the independent variables
+        outputs : Node (or constant) returned by f, or a sequence of them
+        """
+        self._slots = {}
+        self._values = []
+        self._instructions = []
+        for node in tape.nodes:
+            self._record(node)
+
+        self._inputs = [self._slot(node) for node in inputs]
+        outputs, self._scalar = _outputs(outputs)
+        self._outputs = [self._slot(out) if isinstance(out, Node) else None for out in outputs]
+        self._constants = [out if slot is None else None for out, slot in zip(outputs, self._outputs)]
+
+        n = len(self._values)
+        self._left_partials = [0.0] * n
+        self._right_partials = [0.0] * n
+
+    def __len__(self):
+        """
+        Return number of instructions on the tape
+        """
+        return len(self._instructions)
+
+    def _slot(self, node):
+        """
+        Return the slot of a node, registering nodes created outside the traced call as constants
+        """
+        slot = self._slots.get(id(node))
+        if slot is None:
+            slot = len(self._values)
+            self._slots[id(node)] = slot
+            self._values.append(node.value)
+        return slot
+
+    def _record(self, node):
+        """
+        Append a node of the traced graph to the tape
+        """
+        left = None if node.left is None else self._slot(node.left)
+        right = None if node.right is None else self._slot(node.right)
+        slot = self._slot(node)
+        if left is None:
+            return
+        if right is None:
+            rule = _UNARY.get(node.key) or _unary_fallback(node.operation)
+        else:
+            rule = _BINARY.get(node.key) or _binary_fallback(node.operation)
+        self._instructions.append((slot, rule, left, right, node.constant))
+
+    def forward(self, vector):
+        """
+        Forward sweep: evaluate every instruction at the new input vector, storing values and partials
+        """
+        if len(vector) != len(self._inputs):
+            raise Exception('length of vector should be the same as the number of traced inputs')
+        values = self._values
+        left_partials = self._left_partials
+        right_partials = self._right_partials
+        for slot, x in zip(self._inputs, vector):
+            values[slot] = x
+
+        for slot, rule, left, right, constant in self._instructions:
+            if right is None:
+                values[slot], left_partials[slot] = rule(values[left], constant)
+            else:
+                values[slot], left_partials[slot], right_partials[slot] = rule(values[left], values[right])
+
+    def _backward(self, seed_slot):
+        """
+        Reverse sweep from a single output slot, returning the sensitivities of the inputs
+        """
+        sensitivity = [0.0] * len(self._values)
+        sensitivity[seed_slot] = 1
+        left_partials = self._left_partials
+        right_partials = self._right_partials
+        for slot, _, left, right, _ in reversed(self._instructions):
+            s = sensitivity[slot]
+            if s == 0:
+                continue
+            sensitivity[left] += s*left_partials[slot]
+            if right is not None:
+                sensitivity[right] += s*right_partials[slot]
+        return [sensitivity[slot] for slot in self._inputs]
+
+    def value(self, vector):
+        """
+        Return the value of the traced function at vector
+        """
+        self.forward(vector)
+        out = [self._values[slot] if slot is not None else constant
+               for slot, constant in zip(self._outputs, self._constants)]
+        return out[0] if self._scalar else out
+
+    def Jacobian(self, vector):
+        """
+        Return the Jacobian of the traced function at vector, in the same format as ReverseDiff.Jacobian
+        """
+        self.forward(vector)
+        rows = [self._backward(slot) if slot is not None else [0] * len(self._inputs)
+                for slot in self._outputs]
+        return rows[0] if self._scalar else rows
+
+
+def _unary_fallback(operation):
+    """
+    Derivative rule of a node with one child and no rule of its own: evaluate its operation on a dual number
+    """
+    def rule(a, constant):
+        dual = operation(Dual(a))
+        return dual.real, dual.dual
+    return rule
+
+
+def _binary_fallback(operation):
+    """
+    Derivative rule of a node with two children and no rule of its own: evaluate its operation on dual numbers
+    """
+    def rule(a, b):
+        dual = operation(Dual(a, 1), Dual(b, 0))
+        return dual.real, dual.dual, operation(Dual(a, 0), Dual(b, 1)).dual
+    return rule
+
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+
+"""Truncated Taylor polynomial arithmetic for arbitrary-order univariate derivatives in AD forward mode.
+
+This module contains dunder methods to overload built-in Python operators, and the recurrences which propagate
+Taylor coefficients through the elementary functions. Every operation costs O(order^2).
+"""
+
+import numpy as np
+
+class Taylor:
+    """
+    Truncated Taylor polynomial sum_k coeffs[k] * t**k, with coeffs[k] = f^(k)(x) / k!.
+
+    Seeding x with coefficients [x, 1, 0, ..., 0] gives the Taylor coefficients of f at x in f(x).coeffs,
+    and derivatives() turns them into [f(x), f'(x), ..., f^(order)(x)].
+
+    Example:
+    =======
+    z = Taylor.variable(0.5, 4)
+    exp(2*z).derivatives() == [e, 2e, 4e, 8e, 16e]   # e = exp(1)
+    """
+
+    __slots__ = ('coeffs',)
+
+    _supported_scalars = (int, float, np.float64)
+    _supported_types = None # _supported_scalars and Taylor, set below the class body
+
+    def __init__(self, coeffs):
+        self.coeffs = np.asarray(coeffs, dtype=float)
+
+    @classmethod
+    def variable(cls, x, order, direction = 1):
+        """
+        Return the independent variable x + direction*t truncated at the given order
+        """
+        coeffs = np.zeros(order + 1)
+        coeffs[0] = x
+        if order > 0:
+            coeffs[1] = direction
+        return cls(coeffs)
+
+    @property
+    def real(self):
+        """
+        Value of the polynomial at t = 0
+        """
+        return self.coeffs[0]
+
+    @property
+    def order(self):
+        """
+        Truncation order of the polynomial
+        """
+        return len(self.coeffs) - 1
+
+    def derivatives(self):
+        """
+        Return the derivatives [f, f', ..., f^(order)] from the Taylor coefficients
+        """
+        factorials = np.cumprod(np.r_[1.0, np.arange(1, len(self.coeffs))])
+        return self.coeffs * factorials
+
+    def _constant(self, value):
+        """
+        Return a constant polynomial of the same order
+        """
+        coeffs = np.zeros_like(self.coeffs)
+        coeffs[0] = value
+        return Taylor(coeffs)
+
+    def _derivative(self):
+        """
+        Return the coefficients of d/dt of the polynomial, padded to the same length
+        """
+        return np.r_[self.coeffs[1:] * np.arange(1, len(self.coeffs)), 0.0]
+
+    def _integrate(self, value, derivative):
+        """
+        Return the polynomial with constant term value whose derivative has the coefficients derivative
+        """
+        coeffs = np.empty_like(self.coeffs)
+        coeffs[0] = value
+        coeffs[1:] = derivative[:-1] / np.arange(1, len(coeffs))
+        return Taylor(coeffs)
+
+    def __add__(self, other):
+        """
+        overload add operation
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        if isinstance(other, self._supported_scalars):
+            coeffs = self.coeffs.copy()
+            coeffs[0] += other
+            return Taylor(coeffs)
+        else:
+            return Taylor(self.coeffs + other.coeffs)
+
+    def __radd__(self, other):
+        """
+        overload reverse add operation
+        """
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        """
+        overload subtraction operation
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        if isinstance(other, self._supported_scalars):
+            coeffs = self.coeffs.copy()
+            coeffs[0] -= other
+            return Taylor(coeffs)
+        else:
+            return Taylor(self.coeffs - other.coeffs)
+
+    def __rsub__(self, other):
+        """
+        overload reverse subtraction operation
+        """
+        return -self.__sub__(other)
+
+    def __mul__(self, other):
+        """
+        overwrite multiplication operation: truncated convolution of the coefficients
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        if isinstance(other, self._supported_scalars):
+            return Taylor(other*self.coeffs)
+        else:
+            return Taylor(np.convolve(self.coeffs, other.coeffs)[:len(self.coeffs)])
+
+    def __rmul__(self, other):
+        """
+        overwrite reverse multiplication operation
+        """
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        """
+        Overload the division operator (/) to handle Taylor class
+        c = a/b: c_k = (a_k - sum_{j=1..k} b_j c_{k-j}) / b_0
+        """
+        if not isinstance(other, self._supported_types):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        if isinstance(other, self._supported_scalars):
+            return Taylor(self.coeffs/other)
+        a, b = self.coeffs, other.coeffs
+        c = np.empty_like(a)
+        for k in range(len(a)):
+            c[k] = (a[k] - np.dot(b[1:k + 1], c[k - 1::-1][:k])) / b[0]
+        return Taylor(c)
+
+    def __rtruediv__(self, other):
+        """
+        Overload the reverse division operator (/) to handle Taylor class
+        """
+        if not isinstance(other, self._supported_scalars):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        return self._constant(other) / self
+
+    def __pow__(self, other):
+        """
+        overwrite power law operation
+        y = x**p: y_k = 1/(k x_0) sum_{j=1..k} (p j - (k - j)) x_j y_{k-j}
+        """
+        if not isinstance(other, self._supported_scalars):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        x = self.coeffs
+        if x[0] == 0 and float(other).is_integer() and other >= 0:
+            result = self._constant(1.0) # the recurrence divides by x_0: multiply out instead
+            for _ in range(int(other)):
+                result = result*self
+            return result
+        y = np.empty_like(x)
+        y[0] = x[0]**other
+        for k in range(1, len(x)):
+            j = np.arange(1, k + 1)
+            y[k] = np.dot((other*j - (k - j))*x[1:k + 1], y[k - 1::-1][:k]) / (k*x[0])
+        return Taylor(y)
+
+    def __rpow__(self, other):
+        """
+        overwrite reverse power law operation: c**x = exp(x log c)
+        """
+        if not isinstance(other, self._supported_scalars):
+            raise TypeError(f'Type not supported for Taylor number operations')
+        return (self*np.log(other)).exp()
+
+    def __neg__(self):
+        """
+        Overload the negative operator to handle Taylor class
+        """
+        return Taylor(-self.coeffs)
+
+    def exp(self):
+        """
+        e = exp(x): e_k = 1/k sum_{j=1..k} j x_j e_{k-j}
+        """
+        x = self.coeffs
+        e = np.empty_like(x)
+        e[0] = np.exp(x[0])
+        for k in range(1, len(x)):
+            j = np.arange(1, k + 1)
+            e[k] = np.dot(j*x[1:k + 1], e[k - 1::-1][:k]) / k
+        return Taylor(e)
+
+    def log(self):
+        """
+        l = log(x): l_k = (x_k - 1/k sum_{j=1..k-1} j l_j x_{k-j}) / x_0
+        """
+        x = self.coeffs
+        l = np.empty_like(x)
+        l[0] = np.log(x[0])
+        for k in range(1, len(x)):
+            j = np.arange(1, k)
+            l[k] = (x[k] - np.dot(j*l[1:k], x[k - 1:0:-1]) / k) / x[0]
+        return Taylor(l)
+
+    def log2(self):
+        return self.log()/np.log(2)
+
+    def log10(self):
+        return self.log()/np.log(10)
+
+    def _sin_cos(self, sign = -1):
+        """
+        s = sin(x), c = cos(x): s_k = 1/k sum j x_j c_{k-j}, c_k = -1/k sum j x_j s_{k-j}
+        with sign = +1 the same recurrence gives sinh and cosh
+        """
+        x = self.coeffs
+        s = np.empty_like(x)
+        c = np.empty_like(x)
+        if sign < 0:
+            s[0], c[0] = np.sin(x[0]), np.cos(x[0])
+        else:
+            s[0], c[0] = np.sinh(x[0]), np.cosh(x[0])
+        for k in range(1, len(x)):
+            jx = np.arange(1, k + 1)*x[1:k + 1]
+            s[k] = np.dot(jx, c[k - 1::-1][:k]) / k
+            c[k] = sign*np.dot(jx, s[k - 1::-1][:k]) / k
+        return Taylor(s), Taylor(c)
+
+    def sin(self):
+        return self._sin_cos()[0]
+
+    def cos(self):
+        return self._sin_cos()[1]
+
+    def sinh(self):
+        return self._sin_cos(1)[0]
+
+    def cosh(self):
+        return self._sin_cos(1)[1]
+
+    def _tan(self, sign):
+        """
+        t = tan(x) (sign = +1) or tanh(x) (sign = -1): t' = (1 + sign t**2) x', so
+        t_k = 1/k sum_{j=1..k} j x_j w_{k-j} with w = 1 + sign t**2 built up alongside t
+        """
+        x = self.coeffs
+        t = np.zeros_like(x)
+        w = np.zeros_like(x)
+        t[0] = np.tan(x[0]) if sign > 0 else np.tanh(x[0])
+        w[0] = 1 + sign*t[0]*t[0]
+        for k in range(1, len(x)):
+            j = np.arange(1, k + 1)
+            t[k] = np.dot(j*x[1:k + 1], w[k - 1::-1][:k]) / k
+            w[k] = sign*np.dot(t[:k + 1], t[k::-1])
+        return Taylor(t)
+
+    def tan(self):
+        return self._tan(1)
+
+    def tanh(self):
+        return self._tan(-1)
+
+    def sqrt(self):
+        """
+        s = sqrt(x): s_k = (x_k - sum_{j=1..k-1} s_j s_{k-j}) / (2 s_0)
+        """
+        x = self.coeffs
+        s = np.empty_like(x)
+        s[0] = np.sqrt(x[0])
+        for k in range(1, len(x)):
+            s[k] = (x[k] - np.dot(s[1:k], s[k - 1:0:-1])) / (2*s[0])
+        return Taylor(s)
+
+    def arcsin(self):
+        """
+        arcsin(x) = integral of x' / sqrt(1 - x**2)
+        """
+        quotient = Taylor(self._derivative()) / (1 - self*self).sqrt()
+        return self._integrate(np.arcsin(self.coeffs[0]), quotient.coeffs)
+
+    def arccos(self):
+        """
+        arccos(x) = integral of -x' / sqrt(1 - x**2)
+        """
+        quotient = Taylor(self._derivative()) / (1 - self*self).sqrt()
+        return self._integrate(np.arccos(self.coeffs[0]), -quotient.coeffs)
+
+    def arctan(self):
+        """
+        arctan(x) = integral of x' / (1 + x**2)
+        """
+        quotient = Taylor(self._derivative()) / (1 + self*self)
+        return self._integrate(np.arctan(self.coeffs[0]), quotient.coeffs)
+
+    def __lt__(self, other):
+        """
+        Overload the less than operator to handle Taylor class
+        """
+        if isinstance(other, Taylor):
+            return self.real < other.real
+        return self.real < other
+
+    def __gt__(self, other):
+        """
+        Overload the greater than operator to handle Taylor class
+        """
+        if isinstance(other, Taylor):
+            return self.real > other.real
+        return self.real > other
+
+    def __le__(self, other):
+        """
+        Overload the <= operator to handle Taylor class
+        """
+        if isinstance(other, Taylor):
+            return self.real <= other.real
+        return self.real <= other
+
+    def __ge__(self, other):
+        """
+        Overload the >= operator to handle Taylor class
+        """
+        if isinstance(other, Taylor):
+            return self.real >= other.real
+        return self.real >= other
+
+    def __eq__(self, other):
+        if isinstance(other, Taylor):
+            return bool(np.array_equal(self.coeffs, other.coeffs))
+        return self.real == other
+
+    def __repr__(self):
+        """
+        Print class definition
+        """
+        return f'Taylor({self.coeffs.tolist()})'
+
+    def __str__(self):
+        """
+        prettier string representation
+        """
+        return f'Forward mode Taylor polynomial object(coefficients: {self.coeffs})'
+
+Taylor._supported_types = (*Taylor._supported_scalars, Taylor)
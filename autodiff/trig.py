@@ -1,226 +1,201 @@
 #!/usr/bin/env python3
 
+"""Elementary functions for every number type of the package.
+
+Every function looks up the handler of the type of its argument in a per-function table. Handlers are made by the
+factory registered for the type from the rules of autodiff.rules.ELEMENTARY, the table of (value, derivative)
+rules shared by all types, so new number types plug in with register(cls, factory) instead of a new branch in
+every function.
+"""
+
 import numpy as np 
 from autodiff.dual import Dual 
+from autodiff.hyperdual import HyperDual
+from autodiff.taylor import Taylor
 from autodiff.reverse import Node
+from autodiff.rules import ELEMENTARY
+
+_factories = {} # type: handler factory registered for the type
+_handlers = {key: {} for key in ELEMENTARY} # key: {type: handler(x, c)}, filled on first use
+
+
+def register(cls, factory):
+    """
+    Parameters
+    ==========
+    cls : argument type, subclasses use the same factory unless they register their own
+    factory : function of the key of an elementary function in autodiff.rules.ELEMENTARY, returning the
+              handler(x, c) which evaluates that function with parameter c ((loc, scale) for logist, None otherwise)
+              at an object x of type cls
+
+    Example:
+    =======
+    register(Dual, lambda key: lambda x, c: ...)
+    sin(Dual(0.5))  # handler of 'sin' for Dual, called with (Dual(0.5), None)
+    """
+    _factories[cls] = factory
+    for handlers in _handlers.values():
+        handlers.clear()
+
+
+def _resolve(key, cls):
+    """
+    Make and cache the handler of key for cls, from the factory of its closest registered base class
+    """
+    for base in cls.__mro__:
+        if base in _factories:
+            handler = _handlers[key][cls] = _factories[base](key)
+            return handler
+    raise TypeError('type of input argument not supported')
 
 
 def sin(x):
     """
     overwrite sine function
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.sin(x.real), np.cos(x.real)*x.dual)
-    elif type(x) is Node:
-        return Node('sin', left = x, operation = lambda x:sin(x))
-    else:
-        return np.sin(x)  
+    handler = _handlers['sin'].get(type(x)) or _resolve('sin', type(x))
+    return handler(x, None)
 
 def cos(x):
     """
     overwrite cosine function
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.cos(x.real), -np.sin(x.real)*x.dual)
-    elif type(x) is Node:
-        return Node('cos', left = x, operation = lambda x:cos(x))
-    else:
-        return np.cos(x)
- 
+    handler = _handlers['cos'].get(type(x)) or _resolve('cos', type(x))
+    return handler(x, None)
 
 def tan(x):
     """
     overwrite tangent
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.tan(x.real), 1/(np.cos(x.real))**2*x.dual)
-    elif type(x) is Node:
-        return Node('tan', left = x, operation = lambda x:tan(x))
-    else:
-        return np.tan(x)
- 
+    handler = _handlers['tan'].get(type(x)) or _resolve('tan', type(x))
+    return handler(x, None)
 
 def log(x):
     """
     overwrite log
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.log(x.real), 1/x.real*x.dual)
-    elif type(x) is Node:
-        return Node('log', left = x, operation = lambda x:log(x))
-    else:
-        return np.log(x)
+    handler = _handlers['log'].get(type(x)) or _resolve('log', type(x))
+    return handler(x, None)
 
 def log2(x):
     """ 
     overwrite hyberbolic sine
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.log2(x.real), (1/(x.real*np.log(2)))*x.dual)
-    elif type(x) is Node:
-        return Node('log2', left = x, operation = lambda x:log2(x))
-    else:
-        return np.log2(x)   
+    handler = _handlers['log2'].get(type(x)) or _resolve('log2', type(x))
+    return handler(x, None)
 
 def log10(x):
     """ 
     overwrite log10
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.log10(x.real), (1/(x.real*np.log(10)))*x.dual)
-    elif type(x) is Node:
-        return Node('log10', left = x, operation = lambda x:log10(x))
-    else:
-        return np.log10(x)   
+    handler = _handlers['log10'].get(type(x)) or _resolve('log10', type(x))
+    return handler(x, None)
 
 def sinh(x):
     """ 
     overwrite hyberbolic sine
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.sinh(x.real), np.cosh(x.real) * x.dual)
-    elif type(x) is Node:
-        return Node('sinh', left = x, operation = lambda x:sinh(x))
-    else:
-        return np.sinh(x)  
+    handler = _handlers['sinh'].get(type(x)) or _resolve('sinh', type(x))
+    return handler(x, None)
 
 def cosh(x):
     """ 
     overwrite hyberbolic cosine
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.cosh(x.real), np.sinh(x.real) * x.dual)
-    elif type(x) is Node:
-        return Node('cosh', left = x, operation = lambda x:cosh(x))
-    else:
-        return np.cosh(x)  
+    handler = _handlers['cosh'].get(type(x)) or _resolve('cosh', type(x))
+    return handler(x, None)
 
 def tanh(x):
     """ 
     overwrite hyberbolic tangent
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.tanh(x.real), x.dual / np.cosh(x.real)**2)
-    elif type(x) is Node:
-        return Node('tanh', left = x, operation = lambda x:tanh(x))
-    else:
-        return np.tanh(x) 
+    handler = _handlers['tanh'].get(type(x)) or _resolve('tanh', type(x))
+    return handler(x, None)
 
 def exp(x):
     """
     overwrite exponential
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.exp(x.real), np.exp(x.real) * x.dual)
-    elif type(x) is Node:
-        return Node('exp', left = x, operation = lambda x:exp(x))
-    else:
-        return np.exp(x)
+    handler = _handlers['exp'].get(type(x)) or _resolve('exp', type(x))
+    return handler(x, None)
 
 def sqrt(x):
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.sqrt(x.real), 1/2/np.sqrt(x.real) * x.dual)
-    elif type(x) is Node:
-        return Node('sqrt', left = x, operation = lambda x:sqrt(x))
-    else:
-        return np.sqrt(x)
+    handler = _handlers['sqrt'].get(type(x)) or _resolve('sqrt', type(x))
+    return handler(x, None)
 
 def power(x, other):
-    if type(x) is Node:
-        return Node('sqrt', left = x, operation = lambda x:power(x))
-    else:
-        return x.__pow__(other) 
+    """
+    overwrite power, Dual and Node objects use their own __pow__
+    """
+    return x.__pow__(other)
 
 def arcsin(x):
     """ 
     overwrite arc sine
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.arcsin(x.real), 1 / np.sqrt(1 - x.real ** 2) * x.dual)
-    elif type(x) is Node:
-        return Node('arcsin', left = x, operation = lambda x:arcsin(x))
-    else:
-        return np.arcsin(x)   
+    handler = _handlers['arcsin'].get(type(x)) or _resolve('arcsin', type(x))
+    return handler(x, None)
 
 def arccos(x):
     """ 
     overwrite arc cosine
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.arccos(x.real), -1 / np.sqrt(1 - x.real**2) * x.dual)
-    elif type(x) is Node:
-        return Node('arccos', left = x, operation = lambda x:arccos(x))
-    else:
-        return np.arccos(x)    
+    handler = _handlers['arccos'].get(type(x)) or _resolve('arccos', type(x))
+    return handler(x, None)
 
 def arctan(x):
     """ 
     overwrite arc tangent
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.arctan(x.real), 1 / (1 + x.real**2) * x.dual)
-    elif type(x) is Node:
-        return Node('arctan', left = x, operation = lambda x:arctan(x))
-    else:
-        return np.arctan(x)    
+    handler = _handlers['arctan'].get(type(x)) or _resolve('arctan', type(x))
+    return handler(x, None)
 
 def logist(x, loc=0, scale=1):
     """
     overwrite logistic
     default set loc and scale to be 0 and 1
     """
-    supported_types = (int, float, np.float64, Dual, Node)
-    if type(x) not in supported_types:
-        raise TypeError('type of input argument not supported')
-    elif type(x) is Dual:
-        return Dual(np.exp((loc-x.real)/scale)/(scale*(1+np.exp((loc-x.real)/scale))**2), 
-                   np.exp((loc-x.real)/scale)/(scale*(1+np.exp((loc-x.real)/scale))**2)/ \
-                   (scale*(1+np.exp((loc-x.real)/scale))**2)**2* \
-                   ((-1/scale)*(scale*(1+np.exp((loc-x.real)/scale))**2)- \
-                   ((loc-x.real)/scale)*(scale*2*(1+np.exp((loc-x.real)/scale)))*np.exp((loc-x.real)/scale)*(-1)/scale)*x.dual)
-    elif type(x) is Node:
-        return Node('logist', left = x, operation = lambda x:logist(x))
-    else:
-        return np.exp((loc-x)/scale)/(scale*(1+np.exp((loc-x)/scale))**2)
\ No newline at end of file
+    handler = _handlers['logist'].get(type(x)) or _resolve('logist', type(x))
+    return handler(x, (loc, scale))
+
+
+def _scalar(key):
+    return ELEMENTARY[key][0]
+
+def _dual(key):
+    rule = ELEMENTARY[key][1]
+    def _handler(x, c):
+        value, derivative = rule(x.real, c)
+        return type(x)(value, derivative*x.dual)
+    return _handler
+
+def _node(key):
+    return lambda x, c: Node(key, left = x, constant = c)
+
+def _hyperdual(key):
+    if key == 'logist':
+        return _composed_logist
+    rule, second = ELEMENTARY[key][1:]
+    def _handler(x, c):
+        value, derivative = rule(x.real, c)
+        return x._chain(value, derivative, second(x.real, value, c))
+    return _handler
+
+def _taylor(key):
+    if key == 'logist':
+        return _composed_logist
+    method = getattr(Taylor, key)
+    return lambda x, c: method(x)
+
+def _composed_logist(x, c):
+    loc, scale = c
+    e = exp((loc - x)/scale) # composed from exact hyper-dual or Taylor operations
+    return e/(scale*(1 + e)**2)
+
+
+for _cls in (int, float, np.float64, np.ndarray):
+    register(_cls, _scalar)
+register(Dual, _dual)
+register(Node, _node)
+register(HyperDual, _hyperdual)
+register(Taylor, _taylor)
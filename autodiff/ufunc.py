@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""NumPy ufunc and array-function protocols for Dual and Node.
+
+NumPy calls such as np.sin(z), np.exp(2*z) or np.float64(3)*z on Dual (DualArray) and Node objects are mapped
+onto the existing derivative rules: elementary functions go through autodiff.trig, arithmetic and comparisons
+through the overloaded operators of the class. DualArray keeps its vectorized paths, also for np.sum, np.mean,
+np.dot and the @ operator. Object arrays holding dual numbers or nodes work through the methods of the same name
+(sin, exp, ...) which NumPy looks up on the elements, defined on both classes and delegating to UNARY.
+
+Calls which have no rule here are left to NumPy.
+"""
+
+import numpy as np
+import autodiff.trig as tr
+from autodiff.dual import Dual, DualArray
+from autodiff.reverse import Node
+
+# ufunc: function of autodiff.trig, or an expression of the overloaded operators
+UNARY = {
+    np.sin: tr.sin, np.cos: tr.cos, np.tan: tr.tan, np.log: tr.log, np.log2: tr.log2, np.log10: tr.log10,
+    np.sinh: tr.sinh, np.cosh: tr.cosh, np.tanh: tr.tanh, np.exp: tr.exp, np.sqrt: tr.sqrt,
+    np.arcsin: tr.arcsin, np.arccos: tr.arccos, np.arctan: tr.arctan,
+    np.negative: lambda x: -x,
+    np.positive: lambda x: x,
+    np.square: lambda x: x*x,
+    np.reciprocal: lambda x: 1/x,
+    np.exp2: lambda x: 2**x,
+}
+
+# ufunc: (method of the left operand, reflected method of the right operand)
+BINARY = {
+    np.add: ('__add__', '__radd__'),
+    np.subtract: ('__sub__', '__rsub__'),
+    np.multiply: ('__mul__', '__rmul__'),
+    np.true_divide: ('__truediv__', '__rtruediv__'),
+    np.power: ('__pow__', '__rpow__'),
+    np.less: ('__lt__', '__gt__'),
+    np.greater: ('__gt__', '__lt__'),
+    np.less_equal: ('__le__', '__ge__'),
+    np.greater_equal: ('__ge__', '__le__'),
+    np.equal: ('__eq__', '__eq__'),
+    np.not_equal: ('__ne__', '__ne__'),
+}
+
+_TYPES = (Dual, Node)
+
+
+def array_ufunc(ufunc, method, inputs, kwargs):
+    """
+    Implementation of __array_ufunc__ for Dual and Node, NotImplemented for calls without a rule
+    """
+    if method != '__call__' or kwargs:
+        return NotImplemented
+    if ufunc is np.matmul and any(isinstance(x, DualArray) for x in inputs):
+        return _bilinear(np.matmul, *inputs)
+
+    ours = next(x for x in inputs if isinstance(x, _TYPES))
+    if not isinstance(ours, DualArray) and any(isinstance(x, np.ndarray) for x in inputs):
+        # broadcast over the array with NumPy's object loop, which applies the operators element by element
+        return ufunc(*[x if isinstance(x, np.ndarray) else _object_scalar(x) for x in inputs])
+
+    if ufunc in UNARY:
+        return UNARY[ufunc](inputs[0])
+    if ufunc in BINARY:
+        a, b = inputs
+        forward, reflected = BINARY[ufunc]
+        if isinstance(a, _TYPES):
+            return getattr(a, forward)(b)
+        return getattr(b, reflected)(a)
+    return NotImplemented
+
+
+def array_function(func, types, args, kwargs):
+    """
+    Implementation of __array_function__ for Dual and Node: vectorized rules for DualArray, NumPy's own
+    implementation for everything else
+    """
+    rule = FUNCTIONS.get(func)
+    if rule is not None:
+        result = rule(*args, **kwargs)
+        if result is not NotImplemented:
+            return result
+    return func._implementation(*args, **kwargs)
+
+
+def _object_scalar(x):
+    """
+    Wrap x in a 0-d object array, so that a ufunc treats it as an element and not as an operand with __array_ufunc__
+    """
+    array = np.empty((), dtype=object)
+    array[()] = x
+    return array
+
+
+def _pack(real, dual):
+    """
+    Return a Dual for a scalar result and a DualArray otherwise
+    """
+    if np.ndim(real) == 0:
+        return Dual(real, dual)
+    return DualArray(real, dual)
+
+
+def _sum(a, axis = None, **kwargs):
+    if kwargs or not isinstance(a, DualArray):
+        return NotImplemented
+    return _pack(np.sum(a.real, axis), np.sum(a.dual, axis))
+
+
+def _mean(a, axis = None, **kwargs):
+    if kwargs or not isinstance(a, DualArray):
+        return NotImplemented
+    return _pack(np.mean(a.real, axis), np.mean(a.dual, axis))
+
+
+def _dot(a, b, out = None):
+    if out is not None:
+        return NotImplemented
+    return _bilinear(np.dot, a, b)
+
+
+def _bilinear(product, a, b):
+    """
+    Product rule for a bilinear NumPy product of dual number arrays and constant arrays
+    """
+    if isinstance(a, DualArray) and isinstance(b, DualArray):
+        return _pack(product(a.real, b.real), product(a.dual, b.real) + product(a.real, b.dual))
+    if isinstance(a, DualArray) and not isinstance(b, _TYPES):
+        return _pack(product(a.real, b), product(a.dual, b))
+    if isinstance(b, DualArray) and not isinstance(a, _TYPES):
+        return _pack(product(a, b.real), product(a, b.dual))
+    return NotImplemented
+
+
+FUNCTIONS = {np.sum: _sum, np.mean: _mean, np.dot: _dot}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Memory footprint and throughput of Dual and Node on large generated expressions.
+
+Reports bytes per Node of a generated graph (measured with tracemalloc), Node construction rate,
+and Dual operator throughput.
+
+Run from the repository root:
+$ python benchmarks/bench_memory.py [number of nodes]
+"""
+
+import sys
+sys.path.append('.')
+import gc
+import time
+import tracemalloc
+from autodiff.trig import *
+from autodiff.dual import Dual
+from autodiff.reverse import Node, Tape
+
+
+def build(x, n_nodes):
+    """Generated expression mixing arithmetic and elementary functions, about n_nodes nodes"""
+    y = x
+    for i in range(n_nodes // 4):
+        y = sin(y)*x + y/(i + 1)
+    return y
+
+
+def bytes_per_node(n_nodes):
+    gc.collect()
+    tracemalloc.start()
+    with Tape() as tape:
+        y = build(Node('x', value = 0.5), n_nodes)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(tape), len(tape)
+
+
+def node_rate(n_nodes):
+    start = time.perf_counter()
+    y = build(Node('x', value = 0.5), n_nodes)
+    return n_nodes / (time.perf_counter() - start)
+
+
+def dual_rate(n_ops):
+    x = Dual(0.5)
+    start = time.perf_counter()
+    y = x
+    for i in range(n_ops // 4):
+        y = y*x + y/3.0 - x
+        y = y*0.5
+    return n_ops / (time.perf_counter() - start)
+
+
+def main():
+    n_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    size, nodes = bytes_per_node(n_nodes)
+    print(f'nodes in graph        : {nodes}')
+    print(f'bytes per node        : {size:.1f}')
+    print(f'Node construction     : {node_rate(n_nodes):,.0f} nodes/s')
+    print(f'Dual operators        : {dual_rate(n_nodes):,.0f} ops/s')
+
+
+if __name__ == "__main__":
+    main()
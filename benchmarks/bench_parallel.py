@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Speedup of ForwardDiff.Jacobian with its column blocks spread over worker processes, against the serial Jacobian,
+for an expensive function of n inputs, and throughput of ReverseDiff.Jacobian_many over many input points per
+number of workers. One pool is created per worker count and reused, so the timings exclude the pool start-up.
+
+Run from the repository root (the speedup is bounded by the number of cores of the machine):
+$ python benchmarks/bench_parallel.py
+"""
+
+import sys
+sys.path.append('.')
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from autodiff.trig import sin, exp
+from autodiff.autoDiff import ForwardDiff, ReverseDiff
+
+
+def expensive(x):
+    # module level, so that worker processes can unpickle it
+    n = len(x)
+    y = [x_i for x_i in x]
+    for _ in range(20):
+        y = [sin(y[i])*x[(i + 1) % n] + exp(-y[(i + 2) % n]*y[(i + 2) % n]) for i in range(n)]
+    return y
+
+
+def best(fn, repeat = 3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def rosenbrock(x):
+    return sum(100*(x[i + 1] - x[i]**2)**2 + (1 - x[i])**2 for i in range(len(x) - 1))
+
+
+def columns():
+    n = 64
+    x = np.linspace(0.1, 0.9, n)
+    obj = ForwardDiff(expensive)
+    serial = best(lambda: obj.Jacobian(x))
+    print(f'{os.cpu_count()} cores, n = {n}: serial {serial*1e3:.1f} ms')
+    print(f'{"workers":>8}{"chunk":>8}{"time [ms]":>12}{"speedup":>10}')
+    for workers in (1, 2, 4, 8):
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            for chunk_size in (n // workers, max(1, n // (4*workers))):
+                assert np.allclose(obj.Jacobian(x, workers = executor, chunk_size = chunk_size), obj.Jacobian(x))
+                elapsed = best(lambda: obj.Jacobian(x, workers = executor, chunk_size = chunk_size))
+                print(f'{workers:>8}{chunk_size:>8}{elapsed*1e3:>12.1f}{serial/elapsed:>10.2f}')
+
+
+def points():
+    X = np.random.default_rng(0).uniform(0.1, 0.9, (2000, 10))
+    obj = ReverseDiff(rosenbrock)
+    serial = best(lambda: obj.Jacobian_many(X))
+    print(f'Jacobian_many, {len(X)} points of {X.shape[1]} inputs: serial {len(X)/serial:.0f} points/s')
+    print(f'{"workers":>8}{"points/s":>12}{"speedup":>10}')
+    for workers in (1, 2, 4, 8):
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            assert np.allclose(obj.Jacobian_many(X, workers = executor), obj.Jacobian_many(X))
+            elapsed = best(lambda: obj.Jacobian_many(X, workers = executor))
+            print(f'{workers:>8}{len(X)/elapsed:>12.0f}{serial/elapsed:>10.2f}')
+
+
+def main():
+    columns()
+    points()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of ReverseDiff.Jacobian (rebuild the Node graph on every call)
+against CompiledTape.Jacobian (trace once, replay the sweeps)
+and the generated straight-line function of ReverseDiff.generate.
+
+Run from the repository root:
+$ python benchmarks/bench_tape.py
+"""
+
+import sys
+sys.path.append('.')
+import timeit
+import numpy as np
+from autodiff.trig import *
+from autodiff.autoDiff import ReverseDiff
+
+
+def rosenbrock(x):
+    return sum(100*(x[i + 1] - x[i]**2)**2 + (1 - x[i])**2 for i in range(len(x) - 1))
+
+
+def trig_chain(x):
+    y = x[0]
+    for i in range(1, len(x)):
+        y = sin(y*x[i]) + exp(-x[i]/(1 + y*y))
+    return y
+
+
+def main():
+    print(f'{"function":<12}{"n":>6}{"nodes":>8}{"rebuild [us]":>15}{"replay [us]":>15}{"generated [us]":>16}{"speedup":>10}')
+    for f in (rosenbrock, trig_chain):
+        for n in (10, 100):
+            x = np.linspace(0.1, 0.9, n)
+            obj = ReverseDiff(f)
+            tape = obj.compile(x)
+            generated = obj.generate(x)
+            assert np.allclose(tape.Jacobian(x), obj.Jacobian(x))
+            assert np.allclose(generated(x)[1], obj.Jacobian(x))
+            number = max(1, 2000 // n)
+            rebuild = min(timeit.repeat(lambda: obj.Jacobian(x), number=number, repeat=3)) / number
+            replay = min(timeit.repeat(lambda: tape.Jacobian(x), number=number, repeat=3)) / number
+            straight = min(timeit.repeat(lambda: generated(x), number=number, repeat=3)) / number
+            print(f'{f.__name__:<12}{n:>6}{len(tape):>8}{rebuild*1e6:>15.1f}{replay*1e6:>15.1f}{straight*1e6:>16.1f}{rebuild/straight:>10.2f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Fit the cost model of AutoDiff to timings of ForwardDiff.Jacobian and ReverseDiff.Jacobian on the layered functions
+of run_benchmarks.py over input sizes, output sizes and graph depths, with G the number of traced graph nodes:
+
+forward          ~ G*(FORWARD_NODE + FORWARD_TANGENT*n)
+reverse, m = 1   ~ G*REVERSE_NODE
+reverse, m > 1   ~ G*(REVERSE_VECTOR_NODE + REVERSE_ADJOINT*m)
+
+FORWARD_TANGENT is the cost per tangent element of a node, allocation of the tangent array included (the n input
+leaves count as nodes, which accounts for the n x n seed). It only shows for n in the thousands, so the grid goes up
+to n = 5000, and the fits minimize relative errors so that the fast small cases weigh as much as the slow large ones.
+
+Run from the repository root and copy the printed constants (microseconds) into autodiff/autoDiff.py:
+$ python benchmarks/fit_costs.py
+"""
+
+import sys
+sys.path.append('.')
+sys.path.append('benchmarks')
+import numpy as np
+from run_benchmarks import layered, measure
+from autodiff.autoDiff import ForwardDiff, ReverseDiff
+
+
+def main():
+    forward, forward_time, scalar, scalar_time, vector, vector_time = [], [], [], [], [], []
+    for n in (2, 50, 400, 1000, 2000, 5000):
+        for m in (1, 20, 200):
+            for depth in (10, 30):
+                for shared in (True, False):
+                    f = layered(n, m, depth, shared)
+                    x = [0.1 + 0.8*i/n for i in range(n)]
+                    G = len(ReverseDiff(f)._trace(x)[0])
+                    forward.append([G, G*n])
+                    forward_time.append(measure(lambda: ForwardDiff(f).Jacobian(x), repeat = 3)*1e6)
+                    reverse = measure(lambda: ReverseDiff(f).Jacobian(x), repeat = 3)*1e6
+                    if m == 1:
+                        scalar.append([G])
+                        scalar_time.append(reverse)
+                    else:
+                        vector.append([G, G*m])
+                        vector_time.append(reverse)
+    def fit(a, b):
+        # least squares on relative errors with non-negative coefficients: a negative per-tangent or per-adjoint
+        # cost is noise
+        a, b = np.array(a, dtype = float), np.array(b)
+        a, b = a/b[:, None], np.ones(len(b))
+        coefficients = np.linalg.lstsq(a, b, rcond = None)[0]
+        if len(coefficients) == 2 and coefficients[1] < 0:
+            coefficients = np.r_[np.linalg.lstsq(a[:, :1], b, rcond = None)[0], 0.0]
+        return coefficients
+    node, tangent = fit(forward, forward_time)
+    reverse_node, = fit(scalar, scalar_time)
+    vector_node, adjoint = fit(vector, vector_time)
+    print(f'FORWARD_NODE = {node:.2g}\nFORWARD_TANGENT = {tangent:.2g}\nREVERSE_NODE = {reverse_node:.2g}\n'
+          f'REVERSE_VECTOR_NODE = {vector_node:.2g}\nREVERSE_ADJOINT = {adjoint:.2g}')
+
+
+if __name__ == "__main__":
+    main()
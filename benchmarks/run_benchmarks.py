@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for all AD paths, written as machine-readable JSON.
+
+Covers Dual operator throughput, every function of autodiff.trig on Dual and Node, and ForwardDiff.Jacobian
+against ReverseDiff.Jacobian over input sizes, output sizes, graph depths and sharing patterns.
+Every result is the best time per call in seconds over several repeats, the minimum being the least noisy statistic
+on a shared machine.
+
+Run from the repository root, then compare against the stored baseline:
+$ python benchmarks/run_benchmarks.py [output file, default benchmarks.json]
+$ python check_benchmarks.py
+
+To refresh the baseline after an intended change, write the results to it directly:
+$ python benchmarks/run_benchmarks.py benchmarks/baseline.json
+"""
+
+import sys
+sys.path.append('.')
+import json
+import platform
+import time
+import autodiff.trig as tr
+from autodiff.dual import Dual
+from autodiff.reverse import Node
+from autodiff.autoDiff import ForwardDiff, ReverseDiff
+
+TRIG = ('sin', 'cos', 'tan', 'log', 'log2', 'log10', 'sinh', 'cosh', 'tanh', 'exp', 'sqrt',
+        'arcsin', 'arccos', 'arctan', 'logist')
+
+OPERATORS = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'div': lambda a, b: a / b,
+    'pow': lambda a, b: a ** 2.5,
+    'rpow': lambda a, b: 2.5 ** a,
+    'neg': lambda a, b: -a,
+}
+
+
+def measure(fn, min_time = 0.02, repeat = 7):
+    """Best time per call of fn in seconds, calls are batched until a batch takes at least min_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def layered(n, m, depth, shared):
+    """
+    Function of n inputs with m outputs, each output at the end of a chain of depth layers.
+    With shared, all outputs hang off one common chain (one large shared subexpression),
+    otherwise every output has its own chain.
+    """
+    def f(x):
+        if shared:
+            h = sum(x)
+            for k in range(depth):
+                h = tr.sin(h)*x[k % n] + 0.5
+            outputs = [h*x[i % n] + i for i in range(m)]
+        else:
+            outputs = []
+            for i in range(m):
+                y = x[i % n]
+                for k in range(depth):
+                    y = tr.sin(y)*x[(i + k) % n] + 0.5
+                outputs.append(y)
+        return outputs[0] if m == 1 else outputs
+    return f
+
+
+def scalar_benchmarks():
+    results = {}
+    a, b = Dual(0.3, 1.0), Dual(0.7, 0.5)
+    for name, op in OPERATORS.items():
+        results[f'dual/{name}'] = measure(lambda: op(a, b))
+    for name in TRIG:
+        function = getattr(tr, name)
+        results[f'trig/dual/{name}'] = measure(lambda: function(a))
+        node = Node('x', value = 0.3)
+        results[f'trig/node/{name}'] = measure(lambda: function(node))
+    return results
+
+
+def jacobian_benchmarks():
+    results = {}
+    for n in (2, 50):
+        for m in (1, 20):
+            for depth in (10, 100):
+                for shared in (True, False):
+                    f = layered(n, m, depth, shared)
+                    x = [0.1 + 0.8*i/n for i in range(n)]
+                    case = f'n={n},m={m},depth={depth},{"shared" if shared else "independent"}'
+                    results[f'jacobian/forward/{case}'] = measure(lambda: ForwardDiff(f).Jacobian(x))
+                    results[f'jacobian/reverse/{case}'] = measure(lambda: ReverseDiff(f).Jacobian(x))
+    return results
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else 'benchmarks.json'
+    results = {**scalar_benchmarks(), **jacobian_benchmarks()}
+    report = {
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'unit': 'seconds per call',
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    for name, seconds in results.items():
+        print(f'{name:<60}{seconds*1e6:>14.2f} us')
+    print(f'{len(results)} benchmarks written to {output}')
+
+
+if __name__ == "__main__":
+    main()
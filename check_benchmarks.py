@@ -0,0 +1,24 @@
+import sys
+import json
+
+# flag benchmarks more than 50% slower than the baseline, timings on shared machines are noisy
+THRESHOLD = float(sys.argv[1]) if len(sys.argv) > 1 else 1.5
+
+with open('benchmarks/baseline.json') as f:
+    baseline = json.load(f)['results']
+with open('benchmarks.json') as f:
+    results = json.load(f)['results']
+
+regressions = []
+for name, seconds in sorted(results.items()):
+    if name not in baseline:
+        print(f'{name}: no baseline')
+        continue
+    ratio = seconds / baseline[name]
+    if ratio > THRESHOLD:
+        regressions.append(f'{name}: {ratio:.2f}x the baseline ({seconds*1e6:.2f} us against {baseline[name]*1e6:.2f} us)')
+
+if regressions:
+    raise Exception('Benchmark regressions beyond the threshold:\n' + '\n'.join(regressions))
+else:
+    print(f'All {len(results)} benchmarks within {THRESHOLD:.2f}x of the baseline.')
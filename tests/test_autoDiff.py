@@ -3,7 +3,13 @@ sys.path.append('.')
 import numpy as np
 from autodiff.trig import *
 import pytest     
-from autodiff.autoDiff import ForwardDiff, ReverseDiff
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from autodiff.autoDiff import ForwardDiff, ReverseDiff, AutoDiff
+
+
+def parallel_function(x):
+    # module level, so that worker processes can unpickle it
+    return (x[0]*x[1] + sin(x[2]), exp(x[0])/x[4], x[3]**2 + x[2], 4.0)
 
 class TestAutoDiff:
     
@@ -58,6 +64,47 @@ class TestAutoDiff:
         assert (obj_vector.Jacobian([1,1]) == [[1,2],[1,3]]).all()
 
 
+    def test_forwardDiff_Jacobian_single_evaluation(self):
+        calls = []
+        def f(x):
+            calls.append(1)
+            return (x[0]*x[1] + sin(x[2]), exp(x[0])/x[2], 4.0)
+        J = ForwardDiff(f).Jacobian([1.0, 2.0, 3.0])
+        assert len(calls) == 1
+        expected = [[2, 1, np.cos(3)], [np.exp(1)/3, 0, -np.exp(1)/9], [0, 0, 0]]
+        assert np.allclose(J, expected)
+
+        J1 = ForwardDiff(lambda x: (x*x, 3*x)).Jacobian([2.0])
+        assert (J1 == [[4], [3]]).all()
+
+    def test_forwardDiff_Jacobian_parallel(self):
+        x = [1.0, 2.0, 3.0, 0.5, 1.5]
+        expected = ForwardDiff(parallel_function).Jacobian(x)
+        assert np.allclose(ForwardDiff(parallel_function).Jacobian(x, workers = 2), expected)
+        with ProcessPoolExecutor(max_workers = 2) as executor:
+            J = ForwardDiff(parallel_function).Jacobian(x, workers = executor, chunk_size = 2)
+        assert J.shape == (4, 5) and np.allclose(J, expected)
+
+        scalar = lambda x: x[0]*x[1]*x[2]
+        with ThreadPoolExecutor(max_workers = 2) as executor: # threads take lambdas
+            assert np.allclose(ForwardDiff(scalar).Jacobian([1.0, 2.0, 3.0], workers = executor, chunk_size = 1), [6, 3, 2])
+
+    def test_forwardDiff_derivative_batch(self):
+        xs = np.linspace(0.1, 2, 50)
+        obj = ForwardDiff(lambda x: x*sin(x) + 2**x)
+        assert np.allclose(obj.derivative_batch(xs), np.sin(xs) + xs*np.cos(xs) + np.log(2)*2**xs)
+
+        obj_vector = ForwardDiff(lambda x: (x[0]*x[1], exp(x[1]), 1.0))
+        pts = np.column_stack([xs, 2*xs])
+        d = obj_vector.derivative_batch(pts, p=[1, 0.5])
+        assert d.shape == (3, 50)
+        assert np.allclose(d[0], 2*xs + 0.5*xs)
+        assert np.allclose(d[1], 0.5*np.exp(2*xs))
+        assert (d[2] == 0).all()
+
+        with pytest.raises(Exception):
+            obj_vector.derivative_batch(pts, p=[1])
+
     def test_x_and_p_length_restrictions(self):
         f = lambda x: 3 * x
         obj = ForwardDiff(f)
@@ -92,8 +139,186 @@ class TestAutoDiff:
         print(obj_vector.Jacobian([1,1]))
         assert obj_vector.Jacobian([1,1]) == [[1,2],[1,3]]
 
+    def test_reverseDiff_Jacobian_shared_graph(self):
+        def f(x):
+            y = x[0]*x[1]
+            for _ in range(30):
+                y = y*y/(y + 1)
+            return y
+        obj = ReverseDiff(f)
+        g = obj.Jacobian([0.5, 0.5])
+        h = 1e-6
+        numeric = (f([0.5 + h, 0.5]) - f([0.5 - h, 0.5]))/(2*h)
+        assert np.isclose(g[0], numeric)
+        assert np.isclose(g[0], g[1])
 
+    def test_reverseDiff_Jacobian_long_chain(self):
+        def f(x):
+            y = x[0]
+            for _ in range(5000):
+                y = y + x[1]
+            return (y, 2.0)
+        assert ReverseDiff(f).Jacobian([1, 1]) == [[1, 5000], [0, 0]]
 
+    @pytest.mark.filterwarnings('ignore::RuntimeWarning') # the partial of sqrt at 0 is inf
+    def test_reverseDiff_dead_nodes(self):
+        # the discarded sqrt at 0 has an infinite partial, which must not reach the gradient as 0*inf
+        f = lambda x: (sqrt(x[0] - 1.0), x[0]*2 + x[1])[1]
+        assert ReverseDiff(f).Jacobian([1.0, 2.0]) == [2, 1]
+        g = lambda x: [x[0]*x[1], (sqrt(x[0] - 1.0), x[1])[1]]
+        assert np.allclose(ReverseDiff(g).Jacobian([1.0, 2.0]), [[2, 1], [0, 1]])
+        assert np.allclose(ReverseDiff(f).vjp([1.0, 2.0], 1.0), [2, 1])
 
-        
+    def test_reverseDiff_outside_leaves(self):
+        # a Node parameter created outside of f is a constant of the trace, its sensitivity does not grow
+        c = Node('c', value = 3.0)
+        obj = ReverseDiff(lambda x: x[0]*c + sin(c*x[1]))
+        for _ in range(3):
+            assert np.allclose(obj.Jacobian([2.0, 0.5]), [3, 3*np.cos(1.5)])
+        assert c.sensitivity == 0 and c.active
+        y = c*c
+        assert y.active
+
+    def test_reverseDiff_array_output(self):
+        W = np.array([[1.0, 2.0], [0.5, -1.0], [0.0, 3.0]])
+        fs = [lambda x: np.array([x[0]*x[1], x[0]]), lambda x: np.exp(W @ np.array(x))]
+        x = [0.5, 1.5]
+        for f in fs:
+            expected = ForwardDiff(f).Jacobian(x)
+            assert np.allclose(ReverseDiff(f).Jacobian(x), expected)
+            assert np.allclose(ReverseDiff(f).compile(x).Jacobian(x), expected)
+            assert np.allclose(ReverseDiff(f).generate(x)(x)[1], expected)
+            assert np.allclose(ForwardDiff(f).sparse_Jacobian(x).toarray(), expected)
+            assert np.allclose(AutoDiff(f).Jacobian(x), expected)
+            u = np.arange(1.0, len(expected) + 1)
+            assert np.allclose(ReverseDiff(f).vjp(x, u), u @ expected)
+            with pytest.raises(Exception):
+                ReverseDiff(f).vjp(x, [1.0])
+        ad = AutoDiff(fs[1])
+        ad.mode(x)
+        assert ad.decisions[2]['outputs'] == 3
+
+    def test_jvp(self):
+        f = lambda x: (x[0]*x[1], sin(x[0]) + x[2]**2, 7.0)
+        x, v = [1.0, 2.0, 3.0], [0.5, -1.0, 2.0]
+        J = ForwardDiff(f).Jacobian(x)
+        assert np.allclose(ForwardDiff(f).jvp(x, v), J @ np.array(v))
+        assert ForwardDiff(lambda x: x[0]*x[1]).jvp([2.0, 3.0], [1.0, 1.0]) == 5.0
+        assert ForwardDiff(lambda x: x*x).jvp([3.0], [2.0]) == 12.0
+        with pytest.raises(Exception):
+            ForwardDiff(f).jvp(x, [1.0])
+
+    def test_vjp(self):
+        f = lambda x: (x[0]*x[1], sin(x[0]) + x[2]**2, 7.0, x[0]*x[1])
+        x, u = [1.0, 2.0, 3.0], [0.5, -1.0, 2.0, 1.0]
+        J = np.array(ReverseDiff(f).Jacobian(x))
+        assert np.allclose(ReverseDiff(f).vjp(x, u), np.array(u) @ J)
+        assert np.allclose(ReverseDiff(lambda x: x[0]*x[1]).vjp([2.0, 3.0], 2.0), [6.0, 4.0])
+        with pytest.raises(Exception):
+            ReverseDiff(f).vjp(x, [1.0])
+
+    def test_reverseDiff_Jacobian_many(self):
+        points = np.linspace(0.5, 2.0, 35).reshape(7, 5)
+        obj = ReverseDiff(parallel_function)
+        J = obj.Jacobian_many(points)
+        assert J.shape == (7, 4, 5)
+        for k in range(7):
+            assert np.allclose(J[k], obj.Jacobian(points[k]))
+        assert np.allclose(obj.Jacobian_many(points, workers = 2), J)
+        with ProcessPoolExecutor(max_workers = 2) as executor:
+            assert np.allclose(obj.Jacobian_many(points, workers = executor, chunk_size = 2), J)
+
+        scalar = ReverseDiff(lambda x: x[0]*x[1])
+        assert np.allclose(scalar.Jacobian_many([[1.0, 2.0], [3.0, 4.0]]), [[2, 1], [4, 3]])
+        with pytest.raises(TypeError):
+            scalar.Jacobian_many([1.0, 2.0])
+
+    def test_iter_jacobians(self):
+        f = lambda x: [x[0]*sin(x[1]), exp(x[0]) + x[1]*x[2], 3.0]
+        points = np.linspace(0.1, 1.5, 30).reshape(10, 3)
+        forward = list(ForwardDiff(f).iter_jacobians((x for x in points), chunk_size = 4))
+        reverse = list(ReverseDiff(f).iter_jacobians(iter(points), chunk_size = 3))
+        assert len(forward) == len(reverse) == 10
+        for k in range(10):
+            assert np.allclose(forward[k], ForwardDiff(f).Jacobian(list(points[k])))
+            assert np.allclose(reverse[k], forward[k])
+
+        def stream(): # never ends: results must be produced lazily, one chunk at a time
+            k = 0
+            while True:
+                k += 1
+                yield [k, 1.0/k]
+        g = lambda x: x[0]*x[1]
+        for obj in (ForwardDiff(g), ReverseDiff(g)):
+            jacobians = obj.iter_jacobians(stream(), chunk_size = 2)
+            assert np.allclose([next(jacobians) for _ in range(3)], [[1, 1], [0.5, 2], [1/3, 3]])
+
+    def test_iter_jacobians_workers(self, monkeypatch):
+        import autodiff.autoDiff as ad
+        pools = []
+        def pool(max_workers):
+            pools.append(ThreadPoolExecutor(max_workers = max_workers)) # threads take lambdas
+            return pools[-1]
+        monkeypatch.setattr(ad, 'ProcessPoolExecutor', pool)
+        f = lambda x: [x[0]*x[1], sin(x[0])]
+        points = np.linspace(0.1, 1.5, 20).reshape(10, 2)
+        jacobians = list(ReverseDiff(f).iter_jacobians(iter(points), chunk_size = 3, workers = 2))
+        assert np.allclose(jacobians, ReverseDiff(f).Jacobian_many(points))
+        assert len(pools) == 1 and pools[0]._shutdown # one pool for all chunks, shut down at the end
+
+    def test_reverseDiff_Jacobian_single_sweep(self):
+        from autodiff.reverse import Node
+        def f(x):
+            shared = sin(x[0]*x[1]) + exp(x[2])
+            return [shared*x[i] + i for i in range(3)] + [x[1], 2.0]
+        x = [0.5, 1.5, -0.5]
+        propagate = Node._propagate
+        calls = []
+        def counting(node):
+            calls.append(1)
+            propagate(node)
+        Node._propagate = counting
+        try:
+            J = ReverseDiff(f).Jacobian(x)
+        finally:
+            Node._propagate = propagate
+        assert len(calls) == 3 + 4 + 2*3 # one visit per recorded node: inputs, shared subgraph, one mul and add per output
+        assert np.allclose(J, ForwardDiff(f).Jacobian(x))
+        assert J[4] == [0, 0, 0]
+
+    def test_autoDiff_mode_selection(self):
+        many_inputs = lambda x: sum(sin(x_i)*x_i for x_i in x)
+        x = list(np.linspace(0.1, 1.0, 400))
+        ad = AutoDiff(many_inputs)
+        J = ad.Jacobian(x)
+        assert ad.decisions[400]['mode'] == 'reverse'
+        assert ad.decisions[400]['outputs'] == 1
+        assert 'reverse mode' in ad.decisions[400]['reason']
+        assert np.allclose(J, np.sin(x) + np.array(x)*np.cos(x))
+        assert np.allclose(ad.Jacobian(x), J) # remembered decision
+
+        many_outputs = lambda x: [x[0]*k + exp(x[1]) for k in range(50)]
+        ad = AutoDiff(many_outputs)
+        assert ad.mode([0.5, 1.0]) == 'forward'
+        J = ad.Jacobian([0.5, 1.0])
+        assert J.shape == (50, 2)
+        assert np.allclose(J, ReverseDiff(many_outputs).Jacobian([0.5, 1.0]))
+
+        ad = AutoDiff(lambda x: x[0]**2)
+        assert np.allclose(ad.Jacobian([3.0]), [6.0])
+        assert np.allclose(AutoDiff(lambda x: 2.0).Jacobian([1.0, 2.0]), [0.0, 0.0])
 
+    def test_autoDiff_mode_large_inputs(self):
+        # thousands of inputs and a few outputs: the tangents of length n make forward mode the slower one
+        for n, m in ((2000, 2), (5000, 3)):
+            def f(x):
+                outputs = []
+                for i in range(m):
+                    y = x[i]
+                    for k in range(10):
+                        y = sin(y)*x[(i + k) % n] + 0.5
+                    outputs.append(y)
+                return outputs
+            ad = AutoDiff(f)
+            assert ad.mode(list(np.linspace(0.1, 0.9, n))) == 'reverse'
+            assert ad.decisions[n]['outputs'] == m
@@ -0,0 +1,69 @@
+import sys
+sys.path.append('.')
+import numpy as np
+import pytest
+from autodiff.checkpoint import Checkpoint
+from autodiff.autoDiff import ReverseDiff
+from autodiff.trig import sin
+
+
+def step(x):
+    return [x[0] + 0.01*sin(x[1]), x[1] - 0.01*x[0]*x[1]]
+
+
+def unrolled(steps, output = None):
+    def f(x):
+        for _ in range(steps):
+            x = step(x)
+        return x if output is None else output(x)
+    return f
+
+
+@pytest.mark.parametrize('schedule', [{}, {'every': 1}, {'every': 3}, {'every': 100},
+                                      {'snapshots': 0}, {'snapshots': 1}, {'snapshots': 3}, {'snapshots': 50}])
+def test_checkpoint_jacobian(schedule):
+    for steps in (1, 2, 7, 40):
+        chain = Checkpoint(step, steps, **schedule)
+        assert np.allclose(chain.Jacobian([0.5, 1.0]), ReverseDiff(unrolled(steps)).Jacobian([0.5, 1.0]))
+        assert chain.traced == steps
+
+
+def test_checkpoint_output():
+    output = lambda x: x[0]*x[1]
+    expected = ReverseDiff(unrolled(30, output)).Jacobian([0.5, 1.0])
+    assert np.allclose(Checkpoint(step, 30, output, snapshots = 2).Jacobian([0.5, 1.0]), expected)
+    assert np.allclose(Checkpoint(step, 30, output).vjp([0.5, 1.0], 2.0), 2*np.array(expected))
+    u = [1.0, -2.0]
+    assert np.allclose(Checkpoint(step, 30, every = 4).vjp([0.5, 1.0], u),
+                       ReverseDiff(unrolled(30)).vjp([0.5, 1.0], u))
+
+
+def test_checkpoint_schedule():
+    every = Checkpoint(step, 100, every = 10)
+    every.Jacobian([0.5, 1.0])
+    assert every.peak_states <= 20 and every.evaluations < 2*100
+    binomial = Checkpoint(step, 100, snapshots = 3)
+    binomial.Jacobian([0.5, 1.0])
+    assert binomial.peak_states <= 4
+    assert binomial.evaluations > every.evaluations # fewer stored states, more recomputation
+    with pytest.raises(Exception):
+        Checkpoint(step, 10, every = 2, snapshots = 2)
+    with pytest.raises(Exception):
+        Checkpoint(step, 0)
+
+
+def test_checkpoint_long_chain():
+    # the recursion depth grows with the snapshots, not with the steps
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        chain = Checkpoint(step, 400, snapshots = 1)
+        J = chain.Jacobian([0.5, 1.0])
+    finally:
+        sys.setrecursionlimit(limit)
+    assert np.allclose(J, Checkpoint(step, 400).Jacobian([0.5, 1.0]))
+    assert chain.peak_states <= 2
+
+    chain = Checkpoint(step, 5000, snapshots = 2)
+    assert np.allclose(chain.Jacobian([0.5, 1.0]), Checkpoint(step, 5000).Jacobian([0.5, 1.0]))
+    assert chain.peak_states <= 3
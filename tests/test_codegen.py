@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import sys
+sys.path.append('.')
+import pytest
+import numpy as np
+from autodiff.trig import *
+from autodiff.autoDiff import ReverseDiff
+from autodiff.reverse import Node
+import autodiff.codegen as cg
+
+
+def test_generate_scalar():
+    """Test of the generated gradient of a scalar function against ReverseDiff.Jacobian."""
+    f = lambda x: x[0]*sin(x[1]) + 3/x[0] - 2**x[1] + x[0]**3 - tan(x[0])/sqrt(x[1]) + log2(x[1])*arctan(x[0])
+    obj = ReverseDiff(f)
+    g = obj.generate([1.0, 2.0])
+    for x in ([1.0, 2.0], [0.5, 1.5]):
+        value, grad = g(x)
+        assert np.isclose(value, f(x))
+        assert np.allclose(grad, obj.Jacobian(x))
+    assert 'def f_gradient(x):' in g.source
+
+
+def test_generate_vector():
+    """Test of the generated Jacobian of a vector function, including a fallback operation and constants."""
+    def f(x):
+        custom = Node('cube', left = x[0], operation = lambda d: d*d*d)
+        return (x[0]*x[1] - x[1], logist(x[0], 1, 2) + custom, 4.0, x[1], -cosh(x[0])**2)
+    obj = ReverseDiff(f)
+    g = obj.generate([1.0, 2.0])
+    value, J = g([0.5, 1.5])
+    assert value[2:4] == [4.0, 1.5]
+    assert np.allclose(J, obj.Jacobian([0.5, 1.5]))
+    assert J[2] == [0, 0]
+
+
+def test_generate_cache():
+    """Test that the generated function is cached per function and number of inputs."""
+    def f(x):
+        return x[0]*x[0]
+    assert ReverseDiff(f).generate([1.0]) is ReverseDiff(f).generate([3.0])
+    assert cg.cached(f, 1) is not None
+    assert cg.cached(f, 2) is None
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning') # the traced sqrt at 0 has an infinite partial
+def test_generate_dead_nodes():
+    """Test that discarded nodes and partials wrt constants are not emitted."""
+    f = lambda x: (sqrt(x[0] - 1.0), log(x[1] - 3.0), x[0]*2 + x[1])[2]
+    g = ReverseDiff(f).generate([1.0, 2.0])
+    assert 'sqrt' not in g.source and 'log' not in g.source
+    value, J = g([1.0, 2.0])
+    assert value == 4.0 and J == ReverseDiff(f).Jacobian([1.0, 2.0]) == [2, 1]
+
+    h = lambda x: [x[0] + x[1], x[1]*Node('c', value = 3.0)]
+    g = ReverseDiff(h).generate([1.0, 2.0])
+    assert 'dr' not in g.source # no partial wrt the constant leaf
+    assert np.allclose(g([1.0, 2.0])[1][1], [0, 3])
+
+
+def test_generate_domain_errors():
+    """Test that the generated code raises outside of the domain of math functions, where Jacobian returns nan."""
+    f = lambda x: sqrt(x[0])*x[1]
+    g = ReverseDiff(f).generate([1.0, 2.0])
+    with pytest.warns(RuntimeWarning):
+        assert np.isnan(ReverseDiff(f).Jacobian([-1.0, 2.0])).all()
+    with pytest.raises(ValueError):
+        g([-1.0, 2.0])
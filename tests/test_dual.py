@@ -2,7 +2,7 @@
 import pytest
 import sys
 sys.path.append('.')
-from autodiff.dual import Dual 
+from autodiff.dual import Dual, DualArray
 import numpy as np 
 
 def test_add():
@@ -192,4 +192,43 @@ def test_le():
 def test_ge():
     """Test of the  >= operator to handle Dual class"""
     assert (Dual(1) >= 3) == False
-    assert (Dual(1) >= 1) == True 
+    assert (Dual(1) >= 1) == True
+
+def test_vector_dual():
+    """Test of Dual numbers carrying a vector of tangent directions."""
+    x = Dual(2.0, np.array([1.0, 0.0]))
+    y = Dual(3.0, np.array([0.0, 1.0]))
+    z = x*y/(x - 1) + x**2
+    assert z.real == 10
+    assert np.allclose(z.dual, [-3 + 4, 2])
+    assert z == Dual(10.0, z.dual)
+    assert not z == Dual(10.0, np.array([0.0, 0.0]))
+
+def test_dual_array():
+    """Test of elementwise operators of the DualArray class."""
+    x = DualArray([1, 2, 3])
+    assert (x.dual == 1).all() and len(x) == 3 and x.shape == (3,)
+
+    y = (2*x + 1)*x/(x - 4) - x**2 + 2**x
+    real = np.array([1.0, 2.0, 3.0])
+    assert isinstance(y, DualArray)
+    assert np.allclose(y.real, (2*real + 1)*real/(real - 4) - real**2 + 2**real)
+    dual = ((4*real + 1)*(real - 4) - (2*real + 1)*real)/(real - 4)**2 - 2*real + np.log(2)*2**real
+    assert np.allclose(y.dual, dual)
+
+    z = np.array([1.0, 2.0, 3.0]) * x
+    assert isinstance(z, DualArray)
+    assert (z == DualArray(real**2, real)).all()
+    assert x[1] == Dual(2.0, 1.0)
+    assert (x < 2).tolist() == [True, False, False]
+
+    with pytest.raises(TypeError):
+        x + 'a'
+
+
+def test_slots():
+    """Test that Dual and DualArray objects carry no per-instance dictionary."""
+    assert not hasattr(Dual(1), '__dict__')
+    assert not hasattr(DualArray([1, 2]), '__dict__')
+    with pytest.raises(AttributeError):
+        Dual(1).extra = 2
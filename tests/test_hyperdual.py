@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import pytest
+import sys
+sys.path.append('.')
+from autodiff.hyperdual import HyperDual
+from autodiff.trig import *
+from autodiff.autoDiff import ForwardDiff
+import numpy as np
+
+
+def test_arithmetic():
+    """Test of the hyper-dual arithmetic against known first and second derivatives."""
+    x = HyperDual(2.0, 1, 1, 0)
+    for f, d1, d2 in [(lambda x: x*x*x, 12, 12), (lambda x: 1/x, -1/4, 2/8), (lambda x: 3 - x/2 + 4*x, 3.5, 0),
+                      (lambda x: x**2.5, 2.5*2**1.5, 2.5*1.5*2**0.5), (lambda x: 3**x, np.log(3)*9, np.log(3)**2*9),
+                      (lambda x: (x + 1)/(x - 1), -2, 4), (lambda x: -x*x + 1, -4, -2)]:
+        y = f(x)
+        assert np.isclose(y.eps1, d1) and np.isclose(y.eps2, d1) and np.isclose(y.eps12, d2)
+
+    a = HyperDual(1.0, 1, 0, 0)
+    b = HyperDual(2.0, 0, 1, 0)
+    assert (a*b).eps12 == 1
+    assert a < b and b > a and a <= 1 and b >= 2
+    assert a == HyperDual(1.0, 1, 0, 0)
+    with pytest.raises(TypeError):
+        a + 'a'
+    with pytest.raises(TypeError):
+        a**b
+
+    zero = HyperDual(0.0, 1, 1, 0)
+    assert zero**1 == HyperDual(0.0, 1, 1, 0) and zero**0 == HyperDual(1.0, 0, 0, 0)
+    assert (ForwardDiff(lambda x: x[0]**1 + x[1]**2).Hessian([0.0, 1.0]) == [[0, 0], [0, 2]]).all()
+
+
+def test_trig():
+    """Test of the second derivatives of all trig functions on hyper-dual numbers."""
+    h = 1e-4
+    for f in (sin, cos, tan, log, log2, log10, sinh, cosh, tanh, exp, sqrt, arcsin, arccos, arctan, logist):
+        y = f(HyperDual(0.4, 1, 1, 0))
+        assert np.isclose(y.real, f(0.4))
+        assert np.isclose(y.eps1, (f(0.4 + h) - f(0.4 - h))/(2*h))
+        assert np.isclose(y.eps12, (f(0.4 + h) - 2*f(0.4) + f(0.4 - h))/h**2, rtol=1e-5)
+
+
+def test_Hessian():
+    """Test of ForwardDiff.Hessian for scalar and vector functions."""
+    f = lambda x: x[0]**2*x[1] + sin(x[1]*x[2]) + exp(x[0])/x[2]
+    x = [1.0, 2.0, 3.0]
+    H = ForwardDiff(f).Hessian(x)
+    expected = np.array([[2*2 + np.e/3, 2*1, -np.e/9],
+                         [2*1, -9*np.sin(6), np.cos(6) - 6*np.sin(6)],
+                         [-np.e/9, np.cos(6) - 6*np.sin(6), -4*np.sin(6) + 2*np.e/27]])
+    assert np.allclose(H, expected, rtol=1e-14, atol=1e-14)
+
+    H = ForwardDiff(lambda x: (x[0]*x[1], 3.0, x[1]**3)).Hessian([1.0, 2.0])
+    assert H.shape == (3, 2, 2)
+    assert (H == [[[0, 1], [1, 0]], [[0, 0], [0, 0]], [[0, 0], [0, 12]]]).all()
+
+    H = ForwardDiff(lambda x: np.array([x[0]*x[1], x[0]*x[0]])).Hessian([1.0, 2.0])
+    assert H.shape == (2, 2, 2)
+    assert (H == [[[0, 1], [1, 0]], [[2, 0], [0, 0]]]).all()
+    assert ForwardDiff(lambda x: x**4).Hessian([2.0]) == [[48]]
@@ -0,0 +1,62 @@
+import sys
+sys.path.append('.')
+import numpy as np
+import pytest
+from autodiff.memo import Memo
+from autodiff.autoDiff import ForwardDiff, ReverseDiff
+from autodiff.trig import sin
+
+
+def test_memo_hits():
+    calls = []
+    def f(x):
+        calls.append(1)
+        return [x[0]*sin(x[1]), x[0] + x[1]]
+    for cls in (ForwardDiff, ReverseDiff):
+        calls.clear()
+        memo = Memo()
+        obj = cls(f, memo = memo)
+        J = obj.Jacobian([0.5, 1.0])
+        assert np.allclose(obj.Jacobian(np.array([0.5, 1.0])), J) # same bytes as a float array
+        assert np.allclose(obj.Jacobian((0.5, 1.0)), J)
+        assert len(calls) == 1 and memo.hits == 2 and memo.misses == 1
+        obj.Jacobian([0.5, 1.5])
+        assert len(calls) == 2 and len(memo) == 2
+
+
+def test_memo_copies():
+    obj = ReverseDiff(lambda x: [x[0]*x[1], x[0]], memo = Memo())
+    J = obj.Jacobian([2.0, 3.0])
+    J[0][0] = 100.0
+    assert obj.Jacobian([2.0, 3.0])[0][0] == 3.0
+
+
+def test_memo_eviction():
+    memo = Memo(maxsize = 2)
+    obj = ForwardDiff(lambda x: x[0]*x[1], memo = memo)
+    for a in (1.0, 2.0, 3.0):
+        obj.Jacobian([a, 1.0])
+    assert len(memo) == 2 and memo.evictions == 1
+    obj.Jacobian([3.0, 1.0])
+    obj.Jacobian([1.0, 1.0]) # evicted: least recently used
+    assert memo.hits == 1 and memo.misses == 4
+
+    memo = Memo(maxsize = None, maxbytes = 100) # one entry: 16 bytes of input and 16 of result
+    obj = ForwardDiff(lambda x: x[0]*x[1], memo = memo)
+    for a in range(10):
+        obj.Jacobian([float(a), 1.0])
+    assert memo.nbytes <= 100 and len(memo) == 3 and memo.evictions == 7
+    with pytest.raises(Exception):
+        Memo(maxsize = -1)
+
+
+def test_memo_clear():
+    parameters = {'a': 2.0}
+    memo = Memo()
+    obj = ReverseDiff(lambda x: parameters['a']*x[0], memo = memo)
+    assert obj.Jacobian([1.0]) == [2.0]
+    parameters['a'] = 3.0
+    assert obj.Jacobian([1.0]) == [2.0] # stale until cleared
+    memo.clear()
+    assert obj.Jacobian([1.0]) == [3.0]
+    assert len(memo) == 1 and memo.hits == 1
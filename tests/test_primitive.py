@@ -0,0 +1,59 @@
+import sys
+sys.path.append('.')
+import math
+import numpy as np
+import pytest
+from autodiff.primitive import primitive
+from autodiff.dual import Dual, DualArray
+from autodiff.reverse import Node, Tape
+from autodiff.autoDiff import ForwardDiff, ReverseDiff
+from autodiff.trig import sin
+
+
+@primitive(lambda x: 2/math.sqrt(math.pi)*math.exp(-x*x))
+def erf(x):
+    return math.erf(x)
+
+
+@primitive(lambda x, y: (y*math.cos(x*y), x*math.cos(x*y)))
+def sinxy(x, y):
+    return math.sin(x*y)
+
+
+def test_primitive_scalar():
+    assert erf(0.5) == math.erf(0.5)
+    assert sinxy(0.5, 2.0) == math.sin(1.0)
+    assert erf.__name__ == 'erf' and str(erf) == 'erf'
+
+
+def test_primitive_dual():
+    z = erf(Dual(0.5, 2.0))
+    assert z.real == pytest.approx(math.erf(0.5))
+    assert z.dual == pytest.approx(2*2/math.sqrt(math.pi)*math.exp(-0.25))
+    z = sinxy(Dual(0.5, 1.0), 2.0)
+    assert z.dual == pytest.approx(2*math.cos(1.0))
+    z = sinxy(Dual(0.5, 1.0), Dual(2.0, 1.0))
+    assert z.dual == pytest.approx(2.5*math.cos(1.0))
+    z = Dual(np.array([0.0, 0.5]), np.array([1.0, 1.0]))
+    w = primitive(lambda x: np.cos(x))(np.sin)(DualArray(z.real, z.dual))
+    assert isinstance(w, DualArray)
+    assert np.allclose(w.dual, np.cos(z.real))
+
+
+def test_primitive_node():
+    with Tape() as tape:
+        x = Node('x', value = 0.5)
+        z = erf(x)
+    assert len(tape) == 2 and z.left is x and z.key is erf
+    f = lambda x: erf(sin(x[0]))*sinxy(x[0], x[1]) + sinxy(x[1], 3.0)
+    x = [0.5, 1.5]
+    assert np.allclose(ReverseDiff(f).Jacobian(x), ForwardDiff(f).Jacobian(x))
+    assert np.allclose(ReverseDiff(f).compile(x).Jacobian(x), ForwardDiff(f).Jacobian(x))
+    assert np.allclose(ReverseDiff(f).generate(x)(x)[1], ForwardDiff(f).Jacobian(x))
+
+
+def test_primitive_arguments():
+    with pytest.raises(TypeError):
+        primitive(lambda x, y, z: 0)(lambda x, y, z: 0)
+    with pytest.raises(TypeError):
+        erf(0.5, 1.0)
@@ -0,0 +1,68 @@
+import sys
+sys.path.append('.')
+import numpy as np
+import pytest
+from autodiff.trig import *
+from autodiff.dual import Dual
+from autodiff.reverse import Node
+from autodiff.autoDiff import ForwardDiff, ReverseDiff
+from autodiff.profile import Profile, PHASES
+
+
+def f(x):
+    return [sin(x[0])*x[1], exp(x[0]*x[1]) + 1]
+
+
+def test_counts_reverse():
+    with Profile() as profile:
+        J = ReverseDiff(f).Jacobian([1.0, 2.0])
+    assert np.allclose(J, ForwardDiff(f).Jacobian([1.0, 2.0]))
+    assert profile.nodes == {'leaf': 2, 'sin': 1, 'mul': 2, 'exp': 1, 'add': 1}
+    assert profile.peak_graph == 7
+    for phase in PHASES:
+        assert profile.phase_time(phase) > 0
+    assert set(profile.times['sweep']) == {'leaf', 'sin', 'mul', 'exp', 'add'}
+
+
+def test_counts_forward():
+    with Profile() as profile:
+        ForwardDiff(f).Jacobian([1.0, 2.0])
+    assert sum(profile.nodes.values()) == 0
+    assert profile.duals == {'Jacobian': 2, 'sin': 1, 'mul': 2, 'exp': 1, 'add': 1}
+
+
+def test_fallback_duals_attributed_to_node():
+    with Profile() as profile:
+        x = Node('x', value = 0.5)
+        Node('square', left = x, operation = lambda d: d*d)
+    assert profile.nodes['square'] == 1
+    assert profile.duals['square'] == 1 # the input of the fallback evaluation
+    assert profile.duals['mul'] == 1
+
+
+def test_sens_and_reset():
+    with Profile() as profile:
+        x = Node('x', value = 0.5)
+        y = sin(x)*x
+        y._reset()
+        y.sensitivity = 1
+        y._sens()
+    assert x.sensitivity == pytest.approx(np.cos(0.5)*0.5 + np.sin(0.5))
+    assert profile.peak_graph == 3
+    assert profile.times['reset']['*'] > 0
+
+
+def test_disabled_after_exit():
+    init, propagate, dual_init = Node.__init__, Node._propagate, Dual.__init__
+    with Profile() as outer:
+        with Profile() as inner:
+            Dual(1.0)*2
+        Dual(1.0)
+    assert Node.__init__ is init and Node._propagate is propagate and Dual.__init__ is dual_init
+    assert sum(inner.duals.values()) == 2
+    assert sum(outer.duals.values()) == 3
+    with Profile() as profile:
+        pass
+    Dual(1.0)
+    assert sum(profile.duals.values()) == 0
+    assert 'total' in profile.report()
@@ -2,7 +2,7 @@
 import sys
 sys.path.append('.')
 import pytest
-from autodiff.reverse import Node 
+from autodiff.reverse import Node, Tape, Intern
 import numpy as np 
 
 def test_add():
@@ -196,3 +196,155 @@ def test_ge():
     with pytest.raises(TypeError):
         t1 >= 'bad type'
 
+
+def test_sens_shared_subexpression():
+    '''shared nodes must receive the sensitivity of every parent exactly once'''
+    x = Node('x', value = 2)
+    y = x*x
+    z = y*y
+    z.sensitivity = 1
+    z._sens()
+    assert x.sensitivity == 4*2**3
+
+    z._reset()
+    assert x.sensitivity == 0 and y.sensitivity == 0
+    assert z.sensitivity == 1
+
+def test_sens_deep_chain():
+    '''a long chain must not hit the recursion limit'''
+    x = Node('x', value = 1.0)
+    y = x
+    for _ in range(20000):
+        y = y + 1
+    y.sensitivity = 1
+    y._sens()
+    assert x.sensitivity == 1
+
+def test_tape():
+    '''nodes created inside a Tape block are recorded in topological order'''
+    with Tape() as tape:
+        x = Node('x', value = 3)
+        y = x*x + x
+    assert len(tape) == 3
+    assert tape.nodes[0] is x and tape.nodes[-1] is y
+    tape.backward(y)
+    assert x.sensitivity == 7
+
+    with Tape() as outer:
+        with Tape() as inner:
+            z = x*2
+    assert len(outer) == 1 and outer.nodes[0] is inner.nodes[0] is z
+
+def test_partial_rules():
+    '''partials from the derivative rule tables match the dual number derivatives'''
+    import autodiff.trig as tr
+    from autodiff.dual import Dual
+    x = Node('x', value = 0.3)
+    for name in ('sin', 'cos', 'tan', 'log', 'log2', 'log10', 'sinh', 'cosh', 'tanh', 'exp', 'sqrt', 'arcsin', 'arccos', 'arctan'):
+        f = getattr(tr, name)
+        node = f(x)
+        assert node.key == name and node.operation is None
+        assert np.isclose(node.value, f(0.3))
+        assert np.isclose(node.left_partial, f(Dual(0.3)).dual)
+    node = tr.logist(x, 1, 2)
+    assert np.isclose(node.left_partial, tr.logist(Dual(0.3), 1, 2).dual)
+
+    for node, partial in [(2 - x, -1), (2/x, -2/0.09), (2**x, np.log(2)*2**0.3), (x**3, 3*0.09)]:
+        assert node.right is None
+        assert np.isclose(node.left_partial, partial)
+
+    y = Node('y', value = 2.0)
+    p = x**y
+    assert np.isclose(p.value, 0.09)
+    assert np.isclose(p.left_partial, 2*0.3)
+    assert np.isclose(p.right_partial, np.log(0.3)*0.09)
+
+def test_operation_fallback():
+    '''nodes with a key without a derivative rule evaluate their operation on dual numbers'''
+    x = Node('x', value = 2.0)
+    y = Node('y', value = 3.0)
+    cube = Node('cube', left = x, operation = lambda d: d*d*d)
+    assert cube.value == 8 and cube.left_partial == 12
+    hyp = Node('hypot2', left = x, right = y, operation = lambda a, b: a*a + b*b)
+    assert hyp.value == 13 and hyp.left_partial == 4 and hyp.right_partial == 6
+
+def test_slots():
+    '''Node objects carry no per-instance dictionary'''
+    assert not hasattr(Node('x', value = 1), '__dict__')
+    with pytest.raises(AttributeError):
+        Node('x', value = 1).extra = 2
+
+def test_intern():
+    '''repeated subexpressions share one node while interning is active'''
+    from autodiff.trig import sin
+    x = Node('x', value = 0.5)
+    with Tape() as plain:
+        y = sin(x)*sin(x) + sin(x)
+    with Tape() as tape, Intern() as intern:
+        z = sin(x)*sin(x) + sin(x)
+    assert len(plain) == 5 and len(tape) == 3
+    assert intern.deduplicated == 2
+    assert z.left.left is z.left.right
+    tape.backward(z)
+    sensitivity, x.sensitivity = x.sensitivity, 0 # x is not recorded on the tapes
+    plain.backward(y)
+    assert np.isclose(sensitivity, x.sensitivity)
+    assert sin(x) is not sin(x) # no interning outside of the block
+    with Intern():
+        assert x*2 is x*2 and x*2 is not x*3 and x*2 is not x + 2
+
+def test_intern_scope():
+    '''nodes are only merged with nodes recorded on the same tape, and leaves are never merged'''
+    x = Node('x', value = 0.5)
+    with Intern() as intern:
+        with Tape():
+            a = x*x
+        with Tape():
+            b = x*x
+        assert Node('y', value = 1) is not Node('y', value = 1)
+        with Intern() as inner:
+            assert x + 1 is x + 1
+        assert x + 1 is x + 1
+    assert a is not b and intern.deduplicated == 2 and inner.deduplicated == 1
+
+def test_constant_folding():
+    '''subtrees which do not depend on an active leaf are folded to constants and skipped by the reverse pass'''
+    from autodiff.trig import sin, exp
+    x = Node('x', value = 0.5)
+    c = Node('c', value = 2.0, active = False)
+    with Tape() as tape:
+        k = exp(c)*sin(c) + 1
+        y = c*x + x/c - c/x + c**x + x**c - (c - x) + k*x
+    assert not k.active and k.left is None and k.right is None and k.left_partial is None
+    assert np.isclose(k.value, np.exp(2)*np.sin(2) + 1)
+    assert all(node.active for node in tape.nodes)
+    assert c not in tape.nodes and k not in tape.nodes
+    tape.backward(y)
+    expected = 2 + 1/2 + 2/0.25 + np.log(2)*2**0.5 + 2*0.5 + 1 + k.value
+    assert np.isclose(x.sensitivity, expected)
+    assert c.sensitivity == 0
+
+def test_constant_folding_keys():
+    '''a constant left child turns a binary node into the reflected node with a scalar operand'''
+    x = Node('x', value = 3.0)
+    c = Node('c', value = 2.0, active = False)
+    for node, key in [(c + x, 'add'), (c - x, 'rsub'), (c*x, 'mul'), (c/x, 'rdiv'), (c**x, 'rpow'),
+                      (x + c, 'add'), (x - c, 'sub'), (x*c, 'mul'), (x/c, 'div'), (x**c, 'pow')]:
+        assert node.key == key and node.left is x and node.right is None and node.constant == 2.0
+    hyp = Node('hypot2', left = c, right = x, operation = lambda a, b: a*a + b*b) # no reflected rule: stays binary
+    assert hyp.active and hyp.right is x and hyp.value == 13
+
+
+def test_intern_inactive_leaves():
+    # folding drops the inactive child from the node, the interning table must still keep its id taken
+    with Tape(), Intern() as intern:
+        x = Node('x', value = 3.0)
+        values = []
+        for v in (2.0, 5.0, 7.0, 11.0):
+            c = Node('c', value = v, active = False)
+            values.append((x*c).value)
+            del c
+        y = Node('c', value = 2.0, active = False)
+        assert (x*y is x*y) and (x*y).value == 6.0
+    assert values == [6.0, 15.0, 21.0, 33.0]
+    assert intern.deduplicated == 2
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import sys
+sys.path.append('.')
+import pytest
+import numpy as np
+from autodiff.trig import *
+from autodiff.autoDiff import ForwardDiff
+import autodiff.sparse as sp
+
+
+def tridiagonal(x):
+    n = len(x)
+    return [x[i]*x[i] - (x[i - 1] if i > 0 else 0) + sin(x[i + 1] if i < n - 1 else 0.0) for i in range(n)]
+
+
+def test_sparsity_pattern():
+    """Test of the dependency tracing of outputs on inputs."""
+    pattern = sp.sparsity_pattern(tridiagonal, np.linspace(0.1, 1, 5))
+    assert pattern == [[0, 1], [0, 1, 2], [1, 2, 3], [2, 3, 4], [3, 4]]
+    assert sp.sparsity_pattern(lambda x: (x[0], 3.0), [1.0, 2.0]) == [[0], []]
+    assert sp.sparsity_pattern(lambda x: x*x, [1.0]) == [[0]]
+
+
+def test_color_columns():
+    """Test that columns sharing a row never share a color."""
+    pattern = sp.sparsity_pattern(tridiagonal, np.ones(50))
+    colors = sp.color_columns(pattern, 50)
+    assert max(colors) + 1 == 3
+    for row in pattern:
+        assert len({colors[j] for j in row}) == len(row)
+
+
+def test_sparse_Jacobian():
+    """Test of the sparse Jacobian against the dense forward Jacobian."""
+    pytest.importorskip('scipy')
+    x = np.linspace(0.1, 1, 40)
+    obj = ForwardDiff(tridiagonal)
+    J = obj.sparse_Jacobian(x)
+    assert J.shape == (40, 40) and J.nnz == 3*40 - 2
+    assert np.allclose(J.toarray(), obj.Jacobian(x))
+
+    # the coloring is reused at a new point
+    y = np.linspace(-1, 1, 40)
+    assert np.allclose(obj.sparse_Jacobian(y).toarray(), obj.Jacobian(y))
+
+    f = lambda x: (x[0]*x[2], 2.0, exp(x[1]))
+    J = ForwardDiff(f).sparse_Jacobian([1.0, 2.0, 3.0])
+    assert np.allclose(J.toarray(), ForwardDiff(f).Jacobian([1.0, 2.0, 3.0]))
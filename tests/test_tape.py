@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import sys
+sys.path.append('.')
+import pytest
+import numpy as np
+from autodiff.trig import *
+from autodiff.autoDiff import ReverseDiff
+from autodiff.reverse import Node
+
+
+def test_compiled_scalar():
+    """Test of replaying a compiled tape for a scalar function."""
+    f = lambda x: x[0]*sin(x[1]) + 3/x[0] - 2**x[1] + x[0]**3
+    obj = ReverseDiff(f)
+    tape = obj.compile([1.0, 2.0])
+    for x in ([1.0, 2.0], [0.5, -1.0], [2.0, 3.0]):
+        assert np.allclose(tape.Jacobian(x), obj.Jacobian(x))
+        assert np.isclose(tape.value(x), f(x))
+
+
+def test_compiled_vector():
+    """Test of replaying a compiled tape for a vector function with a constant component."""
+    f = lambda x: (x[0]*x[1], exp(x[0]) - x[1], 5.0, x[1])
+    tape = ReverseDiff(f).compile([1.0, 2.0])
+    assert tape.Jacobian([3.0, 4.0]) == [[4.0, 3.0], [np.exp(3.0), -1], [0, 0], [0, 1]]
+    assert tape.value([3.0, 4.0]) == [12.0, np.exp(3.0) - 4.0, 5.0, 4.0]
+
+
+def test_compiled_shared_and_external_nodes():
+    """Test of shared subexpressions and constant nodes created outside the traced call."""
+    c = Node('c', value = 2.0)
+    def f(x):
+        y = x[0]*x[0]
+        return y*y*c
+    tape = ReverseDiff(f).compile([1.0])
+    assert len(tape) == 3
+    assert tape.Jacobian([3.0]) == [2*4*27.0]
+
+
+def test_compiled_input_length():
+    """Test of the input length check of a compiled tape."""
+    tape = ReverseDiff(lambda x: x[0] + x[1]).compile([1, 1])
+    with pytest.raises(Exception):
+        tape.Jacobian([1, 2, 3])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import pytest
+import sys
+sys.path.append('.')
+from math import factorial
+from autodiff.taylor import Taylor
+from autodiff.trig import *
+from autodiff.autoDiff import ForwardDiff
+import numpy as np
+
+
+def test_arithmetic():
+    """Test of Taylor arithmetic against polynomial and rational functions."""
+    z = Taylor.variable(2.0, 5)
+    y = 3*z**3 - z*z + 1 - z/2
+    assert np.allclose(y.derivatives(), [24 - 4 + 1 - 1, 36 - 4 - 0.5, 36 - 2, 18, 0, 0])
+
+    r = 1/(1 - Taylor.variable(0.0, 6)) # geometric series
+    assert np.allclose(r.coeffs, np.ones(7))
+    assert np.allclose((Taylor.variable(0.0, 4)**3).coeffs, [0, 0, 0, 1, 0])
+
+    s = Taylor.variable(4.0, 4)**0.5
+    assert np.allclose(s.derivatives(), [2, 1/4, -1/32, 3/256, -15/2048])
+    assert np.allclose((2**Taylor.variable(1.0, 3)).derivatives(), [2*np.log(2)**k for k in range(4)])
+
+    assert Taylor.variable(1.0, 2) < 2 and Taylor.variable(1.0, 2) >= 1
+    assert Taylor([1, 2]) == Taylor([1.0, 2.0])
+    with pytest.raises(TypeError):
+        z + 'a'
+
+
+def test_trig():
+    """Test of the Taylor recurrences of all trig functions against nested first derivatives."""
+    x0, order = 0.3, 6
+    h = 1e-3
+    for f in (sin, cos, tan, log, log2, log10, sinh, cosh, tanh, exp, sqrt, arcsin, arccos, arctan, logist):
+        d = f(Taylor.variable(x0, order)).derivatives()
+        assert np.isclose(d[0], f(x0))
+        # compare the first derivatives with central differences of the function
+        assert np.isclose(d[1], (f(x0 + h) - f(x0 - h))/(2*h), rtol=1e-5)
+        assert np.isclose(d[2], (f(x0 + h) - 2*f(x0) + f(x0 - h))/h**2, rtol=1e-4)
+
+
+def test_known_series():
+    """Test of high order derivatives with closed forms."""
+    order = 10
+    assert np.allclose(sin(Taylor.variable(0.0, order)).derivatives(), [0, 1, 0, -1, 0, 1, 0, -1, 0, 1, 0])
+    assert np.allclose(exp(2*Taylor.variable(0.0, order)).derivatives(), 2.0**np.arange(order + 1))
+    # d^k/dx^k log(1 + x) at 0 = (-1)^(k+1) (k-1)!
+    expected = [0] + [(-1)**(k + 1)*factorial(k - 1) for k in range(1, order + 1)]
+    assert np.allclose(log(1 + Taylor.variable(0.0, order)).derivatives(), expected)
+    # tan'' at 0 is 0 and tan''' at 0 is 2
+    assert np.allclose(tan(Taylor.variable(0.0, 3)).derivatives(), [0, 1, 0, 2])
+    assert np.allclose(arctan(Taylor.variable(0.0, 5)).derivatives(), [0, 1, 0, -2, 0, 24])
+
+
+def test_ForwardDiff_taylor():
+    """Test of ForwardDiff.taylor for scalar, directional and vector functions."""
+    d = ForwardDiff(lambda x: x*exp(x)).taylor(0.0, 5)
+    assert np.allclose(d, np.arange(6)) # d^k/dx^k x e^x at 0 = k
+
+    d = ForwardDiff(lambda x: (x[0]*x[1], 2.0)).taylor([1.0, 2.0], 2, p=[1, 1])
+    assert d.shape == (2, 3)
+    assert np.allclose(d, [[2, 3, 2], [2, 0, 0]])
+
+    d = ForwardDiff(lambda x: np.array([x[0]*x[1], x[0]])).taylor([1.0, 2.0], 2, p=[1, 1])
+    assert d.shape == (2, 3)
+    assert np.allclose(d, [[2, 3, 2], [1, 1, 0]])
+
+    with pytest.raises(Exception):
+        ForwardDiff(lambda x: x[0]).taylor([1.0, 2.0], 2)
+    with pytest.raises(TypeError):
+        ForwardDiff(lambda x: x).taylor('a', 2)
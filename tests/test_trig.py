@@ -4,7 +4,7 @@ sys.path.append('.')
 import pytest
 from autodiff.trig import *
 import numpy as np 
-from autodiff.dual import Dual 
+from autodiff.dual import Dual, DualArray
 
 def test_sin():
 	"""Test of sin method of the trig class."""
@@ -245,15 +245,13 @@ def test_logist():
          
 		return np.exp((loc-x)/scale)/(scale*(1+np.exp((loc-x)/scale))**2)
 
-	def logist_dual(real, dual, loc=0, scale=1):
-         
-		return np.exp((loc-real)/scale)/(scale*(1+np.exp((loc-real)/scale))**2)/ \
-                   (scale*(1+np.exp((loc-real)/scale))**2)**2* \
-                   ((-1/scale)*(scale*(1+np.exp((loc-real)/scale))**2)- \
-                   ((loc-real)/scale)*(scale*2*(1+np.exp((loc-real)/scale)))*np.exp((loc-real)/scale)*(-1)/scale)*dual
+	def logist_dual(real, dual, loc=0, scale=1, h=1e-6):
+		return (logist_real(real + h, loc, scale) - logist_real(real - h, loc, scale))/(2*h)*dual # central difference
 
 	assert logist(test) == logist_real(test)
-	assert logist(dual) == Dual(logist_real(dual.real), logist_dual(dual.real, dual.dual))
+	assert logist(dual).real == logist_real(dual.real)
+	assert np.isclose(logist(dual).dual, logist_dual(dual.real, dual.dual))
+	assert np.isclose(logist(Dual(0.3), 0.5, 2.0).dual, logist_dual(0.3, 1.0, 0.5, 2.0))
 	test_string = 'test'
 	with pytest.raises(TypeError):
 		logist(test_string) 
@@ -262,4 +260,57 @@ def test_logist():
 	assert logist(test_f) == logist_real(test_f)
 
 	r=logist(Node('x', value=0.5))
-	assert r.value == 0.2350037122015945
\ No newline at end of file
+	assert r.value == 0.2350037122015945
+
+def test_vector_dual():
+	"""Test of trig functions on Dual numbers with a vector dual part."""
+	seed = np.array([1.0, 2.0])
+	for f, df in [(sin, np.cos), (exp, np.exp), (sqrt, lambda x: 0.5/np.sqrt(x)), (arctan, lambda x: 1/(1 + x**2))]:
+		r = f(Dual(0.5, seed))
+		assert np.allclose(r.dual, df(0.5)*seed)
+
+def test_dual_array():
+	"""Test of trig functions applied elementwise to a DualArray."""
+	xs = np.linspace(0.1, 0.9, 7)
+	funcs = [(sin, np.cos), (cos, lambda x: -np.sin(x)), (tan, lambda x: 1/np.cos(x)**2),
+		(log, lambda x: 1/x), (log2, lambda x: 1/(x*np.log(2))), (log10, lambda x: 1/(x*np.log(10))),
+		(sinh, np.cosh), (cosh, np.sinh), (tanh, lambda x: 1/np.cosh(x)**2), (exp, np.exp),
+		(sqrt, lambda x: 0.5/np.sqrt(x)), (arcsin, lambda x: 1/np.sqrt(1 - x**2)),
+		(arccos, lambda x: -1/np.sqrt(1 - x**2)), (arctan, lambda x: 1/(1 + x**2))]
+	for f, df in funcs:
+		r = f(DualArray(xs))
+		assert isinstance(r, DualArray)
+		assert np.allclose(r.real, f(xs))
+		assert np.allclose(r.dual, df(xs))
+	r = logist(DualArray(xs))
+	assert np.allclose(r.real, logist(xs))
+	h = 1e-6
+	assert np.allclose(r.dual, (logist(xs + h) - logist(xs - h))/(2*h)) # central differences
+
+def test_register():
+	"""Test of plugging a new number type into every elementary function through the dispatch registry."""
+	import autodiff.trig as tr
+	from autodiff.rules import ELEMENTARY
+	class Interval:
+		def __init__(self, lo, hi):
+			self.lo, self.hi = lo, hi
+	def interval(key):
+		value = ELEMENTARY[key][0]
+		return lambda x, c: Interval(*sorted((value(x.lo, c), value(x.hi, c))))
+	tr.register(Interval, interval)
+	try:
+		r = exp(Interval(0.0, 1.0))
+		assert (r.lo, r.hi) == (1.0, np.exp(1.0))
+		r = cos(Interval(0.0, 1.0))
+		assert (r.lo, r.hi) == (np.cos(1.0), 1.0)
+		class Narrow(Interval):
+			pass
+		assert type(sqrt(Narrow(1.0, 4.0))) is Interval # subclasses use the factory of their base class
+	finally:
+		del tr._factories[Interval]
+		for handlers in tr._handlers.values():
+			handlers.clear()
+	with pytest.raises(TypeError):
+		sin(Interval(0.0, 1.0))
+	with pytest.raises(TypeError):
+		logist('0.5')